@@ -7,11 +7,11 @@ Multi-pass AI content pipeline:
   Pass 1: Research & Generate (Claude API + Web Search)
   Pass 2: Adversarial Fact-Check Audit (separate Claude call)
   Pass 3: Auto-Fix Critical Issues (if any found)
-  Pass 4: Generate Social Media Derivatives
+  Pass 4: Generate Social Media Derivatives (opt-in; runs alongside Passes 2-3)
   → Gmail notification → You review/edit → Approve → Deploy
 
 Stack: Railway (cron) → Claude API → GitHub → Hostinger
-Notifications: Gmail SMTP (free, no extra accounts needed)
+Notifications: Resend HTTP API (Gmail SMTP when RESEND_API_KEY is not set)
 
 Usage:
   python blog_engine.py --mode scheduled    # Runs the next scheduled post
@@ -20,16 +20,38 @@ Usage:
 """
 
 import os
+import atexit
+import base64
 import json
+import logging
+import logging.handlers
+import mmap
+import random
+import difflib
+import errno
+import functools
+import gzip
 import hashlib
 import re
+import shutil
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import string
+import html as html_lib
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
+from email.message import EmailMessage
 from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
 import argparse
 
+try:
+    import orjson  # optional: ~10x faster JSON for the calendar and pipeline artifacts
+except ImportError:
+    orjson = None
+
 # ---------------------------------------------------------------------------
 # CONFIGURATION — set these as environment variables on Railway
 # ---------------------------------------------------------------------------
@@ -41,15 +63,49 @@ GITHUB_REPO = os.getenv("GITHUB_REPO", "your-username/puertoricollc.com")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 DASHBOARD_URL = os.getenv("DASHBOARD_URL", "https://your-railway-app.up.railway.app")
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")  # Resend.com API key for email (SMTP blocked on Railway)
+ON_RAILWAY = bool(os.getenv("RAILWAY_ENVIRONMENT"))  # set by Railway on every deployment
 DRAFTS_DIR = Path(os.getenv("DRAFTS_DIR", "./drafts"))
 APPROVED_DIR = Path(os.getenv("APPROVED_DIR", "./approved"))
 PRE_GENERATED_DIR = Path(os.getenv("PRE_GENERATED_DIR", "./pre-generated"))
 CALENDAR_PATH = Path(os.getenv("CALENDAR_PATH", "./content_calendar.json"))
+CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")  # research, fixes
+CLAUDE_FAST_MODEL = os.getenv("CLAUDE_FAST_MODEL", "claude-haiku-4-5")  # social copy, news triage
+CLAUDE_AUDIT_MODEL = os.getenv("CLAUDE_AUDIT_MODEL", CLAUDE_FAST_MODEL)  # Pass 2 JSON audit
+ENABLE_SOCIAL_PASS = os.getenv("ENABLE_SOCIAL_PASS", "0") == "1"  # Pass 4 costs 1 extra API call per article
+SOCIAL_USE_BATCH = os.getenv("SOCIAL_USE_BATCH", "0") == "1"  # run Pass 4 via the Batches API (50% cheaper, slower)
+NEWS_USE_BATCH = os.getenv("NEWS_USE_BATCH", "1") == "1"  # news queries via the Batches API (50% cheaper, slower)
+SEEN_ALERTS_PATH = Path(os.getenv("SEEN_ALERTS_PATH", str(DRAFTS_DIR.parent / "seen_alerts.json")))
+CACHE_DIR = Path(os.getenv("CACHE_DIR", "./.claude_cache"))  # Claude responses keyed by request hash
+CACHE_TTL_DAYS = int(os.getenv("CACHE_TTL_DAYS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))  # least recently used responses are evicted past this
+AUDIT_CACHE_DAYS = int(os.getenv("AUDIT_CACHE_DAYS", "30"))  # reuse an A/B audit of an identical article body
+CLAUDE_MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "5"))  # parallel API calls per process
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # WARNING in production drops per-step progress lines
+
+# Log records are buffered and written in one go at phase boundaries and before
+# anything that blocks (API calls, rate-limit waits); warnings flush immediately
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+_log_buffer = logging.handlers.MemoryHandler(capacity=256, flushLevel=logging.WARNING, target=_log_stream)
+# Only this module's logger is buffered; importers (the dashboard) keep their own
+# root logging, so werkzeug/httpx lines aren't held back until the next flush
+logger = logging.getLogger("blog_engine")
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(_log_buffer)
+logger.propagate = False
+
+
+def flush_log():
+    """Write out buffered log records (the buffer is also flushed at exit)."""
+    _log_buffer.flush()
 
 DRAFTS_DIR.mkdir(exist_ok=True)
 APPROVED_DIR.mkdir(exist_ok=True)
 PRE_GENERATED_DIR.mkdir(exist_ok=True)
 
+# Disabled by --no-cache to force fresh API calls
+USE_RESPONSE_CACHE = True
+
 SITE_URL = "https://puertoricollc.com"
 GA_TRACKING_ID = "G-L7DET25V5W"
 
@@ -57,79 +113,64 @@ GA_TRACKING_ID = "G-L7DET25V5W"
 # SYSTEM PROMPTS — the core of the quality pipeline
 # ---------------------------------------------------------------------------
 
-PASS1_SYSTEM_PROMPT = """You are the senior content writer for PuertoRicoLLC.com (Satoshi Ledger LLC), 
-a Puerto Rico-based tax compliance and accounting firm specializing in Act 60 decree management, 
-LLC formation, bookkeeping, forensic audits, and Bitcoin/crypto tax accounting.
-
-## YOUR WRITING STANDARD
-You write at the A++ gold standard of accounting content. Every claim must be:
-- Sourced from official government publications (IRS, Hacienda, DDEC, FinCEN, SEC)
-- Cited with the specific section of law, notice number, or regulation
-- Accurate to the letter — a wrong number or outdated rate could cost readers real money
-
-## VOICE & TONE
-- Authoritative but approachable — like a senior CPA who explains things clearly
-- Never condescending. Your readers are smart business owners and investors.
-- Use real examples with dollar amounts to illustrate tax concepts
-- Bilingual: The ENGLISH version is the primary article. Include a Spanish note directing readers to contact for Spanish help.
-
-## BITCOIN POLICY (CRITICAL)
-- Bitcoin ONLY. Never mention altcoins, Ethereum, DeFi tokens, NFTs, or any other cryptocurrency.
-- When discussing Bitcoin, focus on: long-term holding, business treasury, capital gains, 
-  mining operations, and tax compliance.
-- No speculation, no price predictions, no trading advice.
-
-## CONTENT RULES
-1. Every tax rate MUST cite the specific law section (e.g., "Section 2031.01(b) of Act 60-2019")
-2. Every filing fee MUST cite the government agency's published fee schedule
-3. Every deadline MUST cite the specific regulation or form instructions
-4. If you CANNOT verify a specific number from an official source, write: 
-   "Verify current rate at [source URL]" — NEVER guess
-5. Include a "Sources & References" section at the bottom with direct links
-6. Include the disclaimer: "This content is for informational purposes only and does not 
-   constitute legal or tax advice. Consult a qualified attorney or CPA for advice specific 
-   to your situation."
-7. Every post MUST have a clear CTA linking to the appropriate PuertoRicoLLC.com service
-
-## AVAILABLE INTERNAL LINKS
-- index.html (homepage + contact form)
-- act60-mastery.html (Act 60 comprehensive page)
-- llc-formation.html (LLC formation service)
-- forensic-audit.html (forensic audit service)
-- bookkeeping-payroll.html (bookkeeping service)
-- blog.html (blog index)
-- blog-4percent-strategy.html (4% tax strategy article)
-- blog-llc-vs-corp-reasonable-salary.html (reasonable salary article)
-- blog-llc-vs-scorp-savings.html (LLC vs Corp savings article)
-- blog-optional-tax-method.html (optional tax method article)
-- blog-young-entrepreneur.html (young entrepreneur article)
-
-## CRITICAL: USE THIS EXACT HTML TEMPLATE
-You MUST use the exact template structure below. Replace the placeholders with actual content.
-Do NOT invent your own nav, footer, styles, or layout. Copy this template exactly.
-
-```html
-<!DOCTYPE html>
+# The prompt texts live in prompts/*.md so they can be edited (and diffed) as plain
+# text; they are read once at import
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+
+
+def _load_prompt(name: str) -> str:
+    return (PROMPTS_DIR / f"{name}.md").read_text(encoding="utf-8")
+
+
+# Pass 1's system prompt is sent as three blocks, most stable first. Anthropic caches
+# prompt prefixes, so the rules and output format stay cached when only the internal
+# link list (edited with every new post) changes.
+PASS1_VOICE_RULES = _load_prompt("pass1_voice_rules")
+PASS1_OUTPUT_FORMAT = _load_prompt("pass1_output_format")
+PASS1_INTERNAL_LINKS = _load_prompt("pass1_internal_links")
+PASS1_SYSTEM_PROMPT = (PASS1_VOICE_RULES, PASS1_OUTPUT_FORMAT, PASS1_INTERNAL_LINKS)
+
+# Fixed page blocks shared by ARTICLE_TEMPLATE and the local fixes applied before Pass 3
+_GTAG_HTML = f"""    <!-- Google tag (gtag.js) -->
+    <script async src="https://www.googletagmanager.com/gtag/js?id={GA_TRACKING_ID}"></script>
+    <script>
+      window.dataLayer = window.dataLayer || [];
+      function gtag(){{dataLayer.push(arguments);}}
+      gtag('js', new Date());
+      gtag('config', '{GA_TRACKING_ID}');
+    </script>
+"""
+
+_DISCLAIMER_HTML = """            <!-- Disclaimer -->
+            <div class="bg-slate-100 p-6 rounded-xl text-sm text-slate-500 italic mb-12">
+                <strong>Disclaimer:</strong> This content is for informational purposes only and does not constitute legal or tax advice. Tax laws are complex and subject to change. Consult a qualified Puerto Rico CPA and tax attorney before making any decisions. PuertoRicoLLC.com (Satoshi Ledger LLC) does not guarantee any specific tax outcome.
+            </div>
+"""
+
+# Page skeleton for generated articles. Everything here is deterministic, so it
+# is filled in locally instead of being re-emitted by the model on every run;
+# Pass 1 only writes the fields listed in prompts/pass1_output_format.md.
+ARTICLE_TEMPLATE = string.Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{TITLE}} | PuertoRicoLLC.com</title>
-    <meta name="description" content="{{META_DESCRIPTION}}">
-    <meta name="keywords" content="{{KEYWORDS}}">
+    <title>$title_en | PuertoRicoLLC.com</title>
+    <meta name="description" content="$meta_description">
+    <meta name="keywords" content="$keywords">
     
     <!-- Open Graph -->
-    <meta property="og:title" content="{{TITLE}}">
-    <meta property="og:description" content="{{META_DESCRIPTION}}">
-    <meta property="og:image" content="{{HERO_IMAGE_URL}}">
-    <meta property="og:url" content="https://puertoricollc.com/{{SLUG}}.html">
+    <meta property="og:title" content="$title_en">
+    <meta property="og:description" content="$meta_description">
+    <meta property="og:image" content="$hero_image_url">
+    <meta property="og:url" content="$url">
     <meta property="og:type" content="article">
     
     <!-- Twitter Card -->
     <meta name="twitter:card" content="summary_large_image">
-    <meta name="twitter:title" content="{{TITLE}}">
-    <meta name="twitter:description" content="{{META_DESCRIPTION}}">
-    <meta name="twitter:image" content="{{HERO_IMAGE_URL}}">
+    <meta name="twitter:title" content="$title_en">
+    <meta name="twitter:description" content="$meta_description">
+    <meta name="twitter:image" content="$hero_image_url">
     
     <script src="https://cdn.tailwindcss.com"></script>
     <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
@@ -139,27 +180,19 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
         .lang-active { font-weight: 800; color: #3A99D8 !important; border-bottom: 2px solid #3A99D8; }
         html { scroll-behavior: smooth; }
     </style>
-    <!-- Google tag (gtag.js) -->
-    <script async src="https://www.googletagmanager.com/gtag/js?id=G-L7DET25V5W"></script>
-    <script>
-      window.dataLayer = window.dataLayer || [];
-      function gtag(){dataLayer.push(arguments);}
-      gtag('js', new Date());
-      gtag('config', 'G-L7DET25V5W');
-    </script>
-    
+$gtag_html    
     <!-- Schema.org Article Markup -->
     <script type="application/ld+json">
     {
         "@context": "https://schema.org",
         "@type": "Article",
-        "headline": "{{TITLE}}",
-        "image": "{{HERO_IMAGE_URL}}",
+        "headline": "$headline_json",
+        "image": "$hero_image_url",
         "author": {"@type": "Organization", "name": "PuertoRicoLLC.com"},
         "publisher": {"@type": "Organization", "name": "Satoshi Ledger LLC"},
-        "datePublished": "{{PUBLISH_DATE_ISO}}",
-        "dateModified": "{{PUBLISH_DATE_ISO}}",
-        "description": "{{META_DESCRIPTION}}"
+        "datePublished": "$publish_date_iso",
+        "dateModified": "$publish_date_iso",
+        "description": "$meta_description_json"
     }
     </script>
 </head>
@@ -201,18 +234,18 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
             <!-- Hero Image -->
             <div class="mb-12">
                 <div class="rounded-3xl overflow-hidden shadow-2xl mb-8">
-                    <img src="{{HERO_IMAGE_URL}}" alt="{{HERO_IMAGE_ALT}}" class="w-full h-96 object-cover">
+                    <img src="$hero_image_url" alt="$hero_image_alt" class="w-full h-96 object-cover">
                 </div>
                 <div class="flex items-center gap-4 text-sm text-slate-600 mb-4 flex-wrap">
                     <span class="bg-blue-100 text-blue-800 px-4 py-1 rounded-full font-bold">
-                        <span data-lang="en">{{CATEGORY_EN}}</span>
-                        <span data-lang="es">{{CATEGORY_ES}}</span>
+                        <span data-lang="en">$category_en</span>
+                        <span data-lang="es">$category_es</span>
                     </span>
-                    <span data-lang="en">Published {{PUBLISH_DATE}}</span>
-                    <span data-lang="es">Publicado {{PUBLISH_DATE}}</span>
+                    <span data-lang="en">Published $publish_date</span>
+                    <span data-lang="es">Publicado $publish_date</span>
                     <span>&bull;</span>
-                    <span data-lang="en">{{READ_TIME}} min read</span>
-                    <span data-lang="es">{{READ_TIME}} min lectura</span>
+                    <span data-lang="en">$read_time min read</span>
+                    <span data-lang="es">$read_time min lectura</span>
                 </div>
                 
                 <!-- Spanish note -->
@@ -224,8 +257,8 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
                 </div>
                 
                 <h1 class="text-4xl md:text-5xl font-black text-slate-900 mb-6 leading-tight">
-                    <span data-lang="en">{{TITLE_EN}}</span>
-                    <span data-lang="es">{{TITLE_ES}}</span>
+                    <span data-lang="en">$title_en</span>
+                    <span data-lang="es">$title_es</span>
                 </h1>
             </div>
 
@@ -236,10 +269,10 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
                     <span data-lang="es">Compartir este articulo:</span>
                 </p>
                 <div class="flex justify-center gap-4">
-                    <a href="https://www.facebook.com/sharer/sharer.php?u=https://puertoricollc.com/{{SLUG}}.html" target="_blank" class="w-12 h-12 bg-blue-600 text-white rounded-full flex items-center justify-center hover:bg-blue-700 transition"><i class="fab fa-facebook-f"></i></a>
-                    <a href="https://twitter.com/intent/tweet?url=https://puertoricollc.com/{{SLUG}}.html&text={{TITLE_ENCODED}}" target="_blank" class="w-12 h-12 bg-sky-500 text-white rounded-full flex items-center justify-center hover:bg-sky-600 transition"><i class="fab fa-twitter"></i></a>
-                    <a href="https://www.linkedin.com/sharing/share-offsite/?url=https://puertoricollc.com/{{SLUG}}.html" target="_blank" class="w-12 h-12 bg-blue-700 text-white rounded-full flex items-center justify-center hover:bg-blue-800 transition"><i class="fab fa-linkedin-in"></i></a>
-                    <a href="https://wa.me/?text={{TITLE_ENCODED}}%20https://puertoricollc.com/{{SLUG}}.html" target="_blank" class="w-12 h-12 bg-green-600 text-white rounded-full flex items-center justify-center hover:bg-green-700 transition"><i class="fab fa-whatsapp"></i></a>
+                    <a href="https://www.facebook.com/sharer/sharer.php?u=$url" target="_blank" class="w-12 h-12 bg-blue-600 text-white rounded-full flex items-center justify-center hover:bg-blue-700 transition"><i class="fab fa-facebook-f"></i></a>
+                    <a href="https://twitter.com/intent/tweet?url=$url&text=$title_encoded" target="_blank" class="w-12 h-12 bg-sky-500 text-white rounded-full flex items-center justify-center hover:bg-sky-600 transition"><i class="fab fa-twitter"></i></a>
+                    <a href="https://www.linkedin.com/sharing/share-offsite/?url=$url" target="_blank" class="w-12 h-12 bg-blue-700 text-white rounded-full flex items-center justify-center hover:bg-blue-800 transition"><i class="fab fa-linkedin-in"></i></a>
+                    <a href="https://wa.me/?text=$title_encoded%20$url" target="_blank" class="w-12 h-12 bg-green-600 text-white rounded-full flex items-center justify-center hover:bg-green-700 transition"><i class="fab fa-whatsapp"></i></a>
                 </div>
             </div>
 
@@ -249,23 +282,19 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
             <!-- Use bg-gradient-to-br from-blue-50 to-blue-100 cards for key points -->
             <!-- Use bg-white p-8 rounded-2xl shadow-lg for content sections -->
             
-            {{ARTICLE_BODY}}
+            $article_body
 
             <!-- Sources & References -->
             <div class="bg-white p-8 md:p-12 rounded-2xl shadow-lg mb-12">
                 <h2 class="text-3xl font-black text-slate-900 mb-6">Sources & References</h2>
-                {{SOURCES_LIST}}
-            </div>
-
-            <!-- Disclaimer -->
-            <div class="bg-slate-100 p-6 rounded-xl text-sm text-slate-500 italic mb-12">
-                <strong>Disclaimer:</strong> This content is for informational purposes only and does not constitute legal or tax advice. Tax laws are complex and subject to change. Consult a qualified Puerto Rico CPA and tax attorney before making any decisions. PuertoRicoLLC.com (Satoshi Ledger LLC) does not guarantee any specific tax outcome.
+                $sources_list
             </div>
 
+$disclaimer_html
             <!-- CTA -->
             <div class="bg-gradient-to-r from-blue-600 to-blue-500 text-white p-10 md:p-16 rounded-3xl text-center shadow-2xl mb-12">
-                <h2 class="text-3xl md:text-5xl font-black mb-6">{{CTA_TITLE}}</h2>
-                <p class="text-xl text-blue-100 mb-8 max-w-3xl mx-auto leading-relaxed">{{CTA_DESCRIPTION}}</p>
+                <h2 class="text-3xl md:text-5xl font-black mb-6">$cta_title</h2>
+                <p class="text-xl text-blue-100 mb-8 max-w-3xl mx-auto leading-relaxed">$cta_description</p>
                 <a href="index.html#contact" class="inline-block bg-white text-blue-600 px-10 py-5 rounded-2xl font-black text-xl hover:bg-blue-50 transition shadow-2xl transform hover:scale-105">
                     Schedule Your Consultation <i class="fas fa-arrow-right ml-3"></i>
                 </a>
@@ -275,10 +304,10 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
             <div class="pt-8 border-t border-slate-200 text-center">
                 <p class="text-slate-600 mb-4 font-semibold">Share this article:</p>
                 <div class="flex justify-center gap-4 mb-8">
-                    <a href="https://www.facebook.com/sharer/sharer.php?u=https://puertoricollc.com/{{SLUG}}.html" target="_blank" class="w-12 h-12 bg-blue-600 text-white rounded-full flex items-center justify-center hover:bg-blue-700 transition"><i class="fab fa-facebook-f"></i></a>
-                    <a href="https://twitter.com/intent/tweet?url=https://puertoricollc.com/{{SLUG}}.html&text={{TITLE_ENCODED}}" target="_blank" class="w-12 h-12 bg-sky-500 text-white rounded-full flex items-center justify-center hover:bg-sky-600 transition"><i class="fab fa-twitter"></i></a>
-                    <a href="https://www.linkedin.com/sharing/share-offsite/?url=https://puertoricollc.com/{{SLUG}}.html" target="_blank" class="w-12 h-12 bg-blue-700 text-white rounded-full flex items-center justify-center hover:bg-blue-800 transition"><i class="fab fa-linkedin-in"></i></a>
-                    <a href="https://wa.me/?text={{TITLE_ENCODED}}%20https://puertoricollc.com/{{SLUG}}.html" target="_blank" class="w-12 h-12 bg-green-600 text-white rounded-full flex items-center justify-center hover:bg-green-700 transition"><i class="fab fa-whatsapp"></i></a>
+                    <a href="https://www.facebook.com/sharer/sharer.php?u=$url" target="_blank" class="w-12 h-12 bg-blue-600 text-white rounded-full flex items-center justify-center hover:bg-blue-700 transition"><i class="fab fa-facebook-f"></i></a>
+                    <a href="https://twitter.com/intent/tweet?url=$url&text=$title_encoded" target="_blank" class="w-12 h-12 bg-sky-500 text-white rounded-full flex items-center justify-center hover:bg-sky-600 transition"><i class="fab fa-twitter"></i></a>
+                    <a href="https://www.linkedin.com/sharing/share-offsite/?url=$url" target="_blank" class="w-12 h-12 bg-blue-700 text-white rounded-full flex items-center justify-center hover:bg-blue-800 transition"><i class="fab fa-linkedin-in"></i></a>
+                    <a href="https://wa.me/?text=$title_encoded%20$url" target="_blank" class="w-12 h-12 bg-green-600 text-white rounded-full flex items-center justify-center hover:bg-green-700 transition"><i class="fab fa-whatsapp"></i></a>
                 </div>
                 <a href="blog.html" class="inline-flex items-center gap-2 text-blue-600 font-bold hover:text-blue-700 transition">
                     <i class="fas fa-arrow-left"></i>
@@ -349,201 +378,310 @@ Do NOT invent your own nav, footer, styles, or layout. Copy this template exactl
     </script>
 </body>
 </html>
-```
-
-Replace ALL {{placeholders}} with actual content. The article body should use these section styles:
-- Wrap each major section in: <div class="bg-white p-8 md:p-12 rounded-2xl shadow-lg mb-12">
-- Headings: <h2 class="text-3xl md:text-4xl font-black text-slate-900 mb-6">
-- Subheadings: <h3 class="text-2xl font-bold text-slate-900 mb-4">
-- Body text: <p class="text-lg text-slate-700 leading-relaxed mb-6">
-- Key stat cards: use bg-gradient-to-br from-blue-50 to-blue-100 with icon divs
-- Callout boxes: <div class="bg-blue-50 border-l-4 border-blue-500 p-6 rounded-r-lg">
-- Warning boxes: <div class="bg-yellow-50 border-l-4 border-yellow-500 p-6 rounded-r-lg">
-
-Write ONLY in English. Do not include a full Spanish translation of the article.
-Output ONLY the complete HTML file. No explanation, no markdown, no preamble.
-Start with <!DOCTYPE html> and end with </html>.
-"""
-
-PASS2_AUDIT_PROMPT = """You are a senior CPA and tax attorney conducting a pre-publication 
-compliance audit of a blog post for PuertoRicoLLC.com. Your professional reputation is on the 
-line. This content will be read by IRS auditors, CPAs, and high-net-worth individuals making 
-six-figure financial decisions based on it.
-
-## YOUR AUDIT CHECKLIST
-
-For EVERY factual claim in the post:
-
-1. VERIFY CITATIONS: Does the cited law section/notice/ruling actually say what the post claims?
-   Flag any incorrect or nonexistent citations.
-
-2. VERIFY NUMBERS: Are all tax rates, fees, thresholds, and deadlines accurate?
-   Cross-reference against official sources. Flag any that may be outdated.
-
-3. VERIFY BITCOIN TREATMENT: Does the post correctly distinguish between:
-   - Capital gains vs. ordinary income
-   - Pre-move vs. post-move appreciation 
-   - Personal investment vs. business activity
-   - Chapter 2 (individual) vs. Chapter 3 (export services) treatment
-   Flag any conflation or oversimplification.
+""")
+
+PASS2_AUDIT_PROMPT = _load_prompt("pass2_audit")
+PASS3_FIX_PROMPT = _load_prompt("pass3_fix")
+SOCIAL_MEDIA_PROMPT = _load_prompt("social_media")
+
+# Pass 4 asks for each format in its own call so the four run in parallel.
+# Keys match the social JSON the dashboard renders.
+SOCIAL_FORMAT_PROMPTS = {fmt: _load_prompt(f"social_{fmt}")
+                         for fmt in ("linkedin", "twitter_thread", "email", "instagram_slides")}
+
+NEWS_MONITOR_PROMPT = _load_prompt("news_monitor")
+
+# Output tools: the model submits its report as a tool call, so the API returns
+# schema-shaped JSON instead of JSON embedded in prose
+_ISSUE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "severity": {"type": "string"},
+        "location": {"type": "string"},
+        "issue": {"type": "string"},
+        "fix": {"type": "string"},
+        "recommendation": {"type": "string"},
+        "suggestion": {"type": "string"},
+        "source_to_verify": {"type": "string"},
+    },
+}
 
-4. CHECK FOR MISSING CITATIONS: Flag any factual claim that lacks a specific source reference.
+AUDIT_TOOL = {
+    "name": "submit_audit",
+    "description": "Submit the completed pre-publication audit report.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "overall_grade": {"type": "string", "enum": ["A", "B", "C", "F"]},
+            "publish_ready": {"type": "boolean"},
+            "critical_issues": {"type": "array", "items": _ISSUE_SCHEMA},
+            "warnings": {"type": "array", "items": _ISSUE_SCHEMA},
+            "suggestions": {"type": "array", "items": _ISSUE_SCHEMA},
+            "sources_verified": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "claim": {"type": "string"},
+                        "source": {"type": "string"},
+                        "status": {"type": "string", "enum": ["VERIFIED", "UNVERIFIED", "OUTDATED"]},
+                    },
+                },
+            },
+            "spanish_issues": {"type": "array", "items": _ISSUE_SCHEMA},
+        },
+        "required": ["overall_grade", "publish_ready", "critical_issues", "warnings", "suggestions"],
+    },
+}
 
-5. CHECK DISCLAIMERS: Does the post include proper "not legal/tax advice" disclaimers?
-   Does it avoid language that could be construed as personalized advice?
+NEWS_REPORT_TOOL = {
+    "name": "submit_report",
+    "description": "Submit the regulatory news findings (an empty alerts list if nothing relevant).",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "alerts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "headline": {"type": "string"},
+                        "source": {"type": "string"},
+                        "relevance": {"type": "string"},
+                        "urgency": {"type": "string", "enum": ["HIGH", "MEDIUM", "LOW"]},
+                        "suggested_title": {"type": "string"},
+                        "suggested_slug": {"type": "string"},
+                        "cluster": {"type": "string"},
+                    },
+                    "required": ["headline", "source", "relevance", "urgency", "suggested_title"],
+                },
+            },
+            "no_alerts": {"type": "boolean"},
+        },
+        "required": ["alerts", "no_alerts"],
+    },
+}
 
-6. CHECK SPANISH ACCURACY: Do the Spanish translations accurately convey the same 
-   technical meaning? Are legal/tax terms translated correctly?
-   (e.g., "capital gains" = "ganancias de capital", not "ganancias capitales")
 
-7. CHECK FOR STALE INFORMATION: Flag any claim about pending legislation, rates, or 
-   rules that may have changed. Note what needs to be verified against current sources.
+# ---------------------------------------------------------------------------
+# CORE ENGINE
+# ---------------------------------------------------------------------------
 
-8. CHECK INTERNAL CONSISTENCY: Do the numbers in examples add up? Are percentages applied correctly?
+# Markdown fences Claude sometimes wraps around HTML/JSON output
+_FENCE_OPEN_RE = re.compile(r"^```(?:html?|json?)?\s*", re.MULTILINE)
+_FENCE_CLOSE_RE = re.compile(r"```\s*$", re.MULTILINE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+_HTML_DOC_RE = re.compile(r"(<!DOCTYPE html.*</html>)", re.DOTALL | re.IGNORECASE)
+_JSON_FENCE_RE = re.compile(r"```json?\s*\n?(.*?)\n?\s*```", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_SLUG_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+_HTML_COMMENT_RE = re.compile(r"<!--(?!\[).*?-->", re.DOTALL)
+_INTER_TAG_SPACE_RE = re.compile(r">\s+<")
+_LEADING_SPACE_RE = re.compile(r"^[ \t]+", re.MULTILINE)
+_PRE_BLOCK_RE = re.compile(r"(<pre\b.*?</pre>)", re.DOTALL | re.IGNORECASE)
+
+
+def _strip_fences(text: str) -> str:
+    """Remove ```html / ```json fences from a Claude response and trim whitespace."""
+    text = text.strip()
+    if "```" not in text:
+        return text
+    # Usual case: one fence on the first line and one on the last, handled with
+    # string ops; the regexes only run if fences remain somewhere else
+    first, _, rest = text.partition("\n")
+    if first.startswith("```"):
+        text = rest
+    if text.endswith("```"):
+        text = text[:-3]
+    if "```" not in text:
+        return text.strip()
+    return _FENCE_CLOSE_RE.sub("", _FENCE_OPEN_RE.sub("", text)).strip()
+
+
+def _extract_json_object(raw: str) -> dict | None:
+    """Pull a JSON object out of a Claude response, tolerating markdown fences and
+    preamble text. Returns None when no candidate parses to a dict."""
+    fence = _JSON_FENCE_RE.search(raw)
+    braces = _JSON_OBJECT_RE.search(raw)
+    candidates = (
+        raw,  # tool input arrives as plain JSON
+        fence.group(1).strip() if fence else None,  # ```json ... ```
+        braces.group(0) if braces else None,  # outermost { ... }
+        _strip_fences(raw),
+    )
+    for text in candidates:
+        if not text:
+            continue
+        try:
+            parsed = _json_loads(text)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
 
-## OUTPUT FORMAT (respond ONLY in this JSON structure)
 
-{
-  "overall_grade": "A/B/C/F",
-  "publish_ready": true/false,
-  "critical_issues": [
-    {
-      "severity": "CRITICAL",
-      "location": "paragraph/section description",
-      "issue": "what's wrong",
-      "fix": "suggested correction",
-      "source_to_verify": "URL or document name"
-    }
-  ],
-  "warnings": [
-    {
-      "severity": "WARNING",
-      "location": "paragraph/section description",
-      "issue": "what's concerning",
-      "recommendation": "what to check or change"
-    }
-  ],
-  "suggestions": [
-    {
-      "severity": "SUGGESTION",
-      "location": "paragraph/section description",
-      "suggestion": "improvement idea"
-    }
-  ],
-  "sources_verified": [
-    {"claim": "summary of claim", "source": "citation", "status": "VERIFIED/UNVERIFIED/OUTDATED"}
-  ],
-  "spanish_issues": [
-    {"location": "where", "issue": "translation problem", "fix": "corrected text"}
-  ]
-}
-"""
+_anthropic_client = None
+_client_lock = threading.Lock()
+RETRY_MAX_WAIT = 120  # seconds
 
-PASS3_FIX_PROMPT = """You are correcting a blog post for PuertoRicoLLC.com based on audit findings.
+# Caps simultaneous in-flight Claude requests across pipeline threads
+_claude_slots = threading.BoundedSemaphore(CLAUDE_MAX_CONCURRENCY)
 
-You will receive:
-1. The original HTML blog post
-2. The audit report with CRITICAL issues that must be fixed
+# Rate-limit budgets per model as last reported by the API's anthropic-ratelimit-*
+# headers: {(model, limit): (remaining, reset_at)} for the "requests" and
+# "input-tokens" limits. call_claude checks them before each request so it waits
+# only as long as needed instead of sending a request that will come back 429.
+_RATE_LIMITS = ("requests", "input-tokens")
+_rate_budget: dict[tuple[str, str], tuple[int, datetime]] = {}
+_rate_lock = threading.Lock()
 
-Your job:
-- Fix EVERY critical issue identified in the audit
-- Verify corrections against the source documents cited
-- Do NOT change anything that wasn't flagged
-- Maintain the exact same HTML structure and formatting
-- Output ONLY the corrected complete HTML file
 
-Start with <!DOCTYPE html> and end with </html>.
-"""
+def _record_rate_limits(model: str, http_response):
+    """Remember the request and input-token budgets from a response's headers."""
+    headers = getattr(http_response, "headers", None)
+    if headers is None:
+        return
+    for limit in _RATE_LIMITS:
+        try:
+            remaining = int(headers[f"anthropic-ratelimit-{limit}-remaining"])
+            reset_at = datetime.fromisoformat(
+                headers[f"anthropic-ratelimit-{limit}-reset"].replace("Z", "+00:00"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        with _rate_lock:
+            _rate_budget[model, limit] = (remaining, reset_at)
+
+
+def wait_for_rate_budget(model: str, tokens_needed: int):
+    """Sleep until the model's budgets can cover one more request of tokens_needed
+    input tokens. Returns at once when the last response left enough headroom or no
+    budget is known yet (the 429 retry loop in call_claude remains the backstop)."""
+    needed = {"requests": 1, "input-tokens": tokens_needed}
+    wait, short = 0.0, None
+    with _rate_lock:
+        for limit in _RATE_LIMITS:
+            budget = _rate_budget.get((model, limit))
+            if budget is None or budget[0] >= needed[limit]:
+                continue
+            limit_wait = (budget[1] - datetime.now(budget[1].tzinfo)).total_seconds()
+            if limit_wait > wait:
+                wait, short = limit_wait, (limit, budget[0])
+    if short is None:
+        return
+    wait = min(wait + 1, RETRY_MAX_WAIT)
+    logger.info("⏳ %s %s budget low (%s left, ~%s needed) — waiting %.0fs for reset...",
+                model, short[0], short[1], needed[short[0]], wait)
+    flush_log()
+    time.sleep(wait)
+
+
+def _estimate_tokens(*texts: str) -> int:
+    """Rough input-token count (~4 characters per token)."""
+    return sum(len(t) for t in texts) // 4
+
+
+def _get_client():
+    """Return the process-wide Anthropic client, creating it on first use.
+    Reusing one client keeps its connection pool (and TLS sessions) alive across passes."""
+    global _anthropic_client
+    with _client_lock:
+        if _anthropic_client is None:
+            import anthropic
+            import httpx
+            # httpx drops idle connections after 5s by default, which is shorter than
+            # the gaps between passes; keep them long enough to carry one TLS session
+            # across the whole pipeline
+            _anthropic_client = anthropic.Anthropic(
+                api_key=ANTHROPIC_API_KEY,
+                http_client=anthropic.DefaultHttpxClient(
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8,
+                                        keepalive_expiry=120.0),
+                ),
+            )
+        return _anthropic_client
 
-SOCIAL_MEDIA_PROMPT = """You generate social media derivative content from a published blog post 
-for PuertoRicoLLC.com (@SatoshiLedger).
-
-Generate ALL of the following from the blog post provided:
-
-## 1. LINKEDIN POST (200-300 words)
-- Written as the founder of Satoshi Ledger LLC, first person
-- Professional but not corporate — knowledgeable and direct
-- Opens with a hook that would stop a scrolling Act 60 holder or potential relocator
-- Ends with a link to the full article
-- Include 3-5 relevant hashtags
-
-## 2. TWITTER/X THREAD (5-7 tweets)
-- Thread format: "🧵 1/7: [hook]"
-- Each tweet under 280 characters
-- Last tweet links to the full article
-- Mix of insight, data points, and practical takeaways
-
-## 3. EMAIL NEWSLETTER SNIPPET (3 paragraphs)
-- Subject line (compelling, under 60 characters)
-- Preview text (under 100 characters)
-- 3-paragraph summary with "Read the full analysis →" CTA
-
-## 4. INSTAGRAM CAROUSEL TEXT (6-8 slides)
-- Slide 1: Bold headline/hook
-- Slides 2-6: Key points (short, visual-friendly text)
-- Slide 7: CTA to visit the blog
-- Slide 8: Brand slide — PuertoRicoLLC.com | @SatoshiLedger
-
-Output as JSON with keys: linkedin, twitter_thread (array), email (with subject, preview, body), 
-instagram_slides (array of slide text).
-"""
 
-NEWS_MONITOR_PROMPT = """You are a regulatory news monitor for PuertoRicoLLC.com, a Puerto Rico 
-tax compliance firm specializing in Act 60 and Bitcoin tax accounting.
-
-Your job: Scan the provided search results and determine if any contain NEW regulatory 
-developments that would be relevant to the firm's audience (Act 60 decree holders, PR business 
-owners, Bitcoin investors in PR).
-
-Relevant triggers include:
-- New IRS guidance, notices, or revenue rulings affecting US territories or digital assets
-- New Hacienda circulars or administrative determinations
-- Changes to DDEC decree application requirements
-- New legislation passed or signed affecting PR tax incentives
-- FinCEN updates on FBAR or BSA reporting for Bitcoin
-- SEC actions affecting Bitcoin ETFs or digital asset classification
-- FASB updates on Bitcoin accounting standards
-- Federal court decisions affecting Act 60 or territorial tax treatment
-
-For each relevant development found, output JSON:
-{
-  "alerts": [
-    {
-      "headline": "short description",
-      "source": "official source name and URL",
-      "relevance": "why this matters to Act 60 holders / Bitcoin investors in PR",
-      "urgency": "HIGH/MEDIUM/LOW",
-      "suggested_title": "blog post title that would cover this",
-      "suggested_slug": "blog-url-slug",
-      "cluster": "which of the 5 clusters this fits"
-    }
-  ],
-  "no_alerts": true/false
-}
+_http_client = None
 
-If nothing relevant was found, return: {"alerts": [], "no_alerts": true}
-"""
 
+def _get_http():
+    """Return the process-wide httpx client for GitHub and Resend calls. One pool means
+    the blog.html fetch/push and the notification email reuse open TLS connections."""
+    global _http_client
+    with _client_lock:
+        if _http_client is None:
+            import httpx
+            _http_client = httpx.Client(
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=120.0),
+            )
+        return _http_client
 
-# ---------------------------------------------------------------------------
-# CORE ENGINE
-# ---------------------------------------------------------------------------
 
-def call_claude(system_prompt: str, user_message: str, use_web_search: bool = False) -> str:
-    """Call the Anthropic API using the official SDK. Supports web search for live research.
-    Includes retry logic for rate limits (429 errors)."""
-    import anthropic
-    import time
+HTTP_MAX_TRIES = 4
 
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-    model = "claude-sonnet-4-5-20250929"
 
-    print(f"  Calling Claude API (model: {model}, web_search: {use_web_search})...")
+def _http_request(method: str, url: str, **kwargs):
+    """Send a request on the shared client, retrying network errors, 429s and 5xx
+    with exponential backoff plus jitter (1s, 2s, 4s). Honours Retry-After, which
+    GitHub sends with secondary rate limits. Returns the last response; raises the
+    last network error if every attempt failed to connect."""
+    import httpx
 
+    for attempt in range(HTTP_MAX_TRIES):
+        try:
+            resp = _get_http().request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if attempt == HTTP_MAX_TRIES - 1:
+                raise
+            logger.warning("%s %s failed (%s), retrying...", method, url, e)
+            wait_time = 2 ** attempt + random.random()
+        else:
+            retry_after = resp.headers.get("retry-after")
+            retryable = resp.status_code == 429 or resp.status_code >= 500 or (
+                resp.status_code == 403 and retry_after)
+            if not retryable or attempt == HTTP_MAX_TRIES - 1:
+                return resp
+            logger.warning("%s %s returned %s, retrying...", method, url, resp.status_code)
+            wait_time = 2 ** attempt + random.random()
+            try:
+                wait_time = float(retry_after or wait_time)
+            except ValueError:
+                pass
+        time.sleep(min(wait_time, RETRY_MAX_WAIT))
+
+
+def _system_blocks(system_prompt: str | tuple[str, ...], cache_control: dict) -> list[dict]:
+    """Turn a system prompt into Messages API blocks. A plain string is one cached block.
+    A tuple is sent as separate blocks: each one but the last is a cache breakpoint, and
+    the last (the part edited most often) is sent uncached after them."""
+    if isinstance(system_prompt, str):
+        return [{"type": "text", "text": system_prompt, "cache_control": cache_control}]
+    *stable, volatile = system_prompt
+    return ([{"type": "text", "text": text, "cache_control": cache_control} for text in stable]
+            + [{"type": "text", "text": volatile}])
+
+
+def _build_request(system_prompt: str | tuple[str, ...], user_message: str, use_web_search: bool = False,
+                   web_search_max_uses: int = 10, model: str = CLAUDE_MODEL,
+                   max_tokens: int = 4096, prompt_cache_ttl: str | None = None,
+                   output_tool: dict | None = None) -> dict:
+    """Build the Messages API parameters shared by call_claude and call_claude_batch.
+    prompt_cache_ttl ("5m" default, or "1h") is how long Anthropic keeps the system
+    prompt cached. output_tool is a tool definition whose schema-validated input is
+    returned (as JSON text) in place of the model's prose."""
+    cache_control = {"type": "ephemeral"}
+    if prompt_cache_ttl:
+        cache_control["ttl"] = prompt_cache_ttl
     kwargs = {
         "model": model,
-        "max_tokens": 16000,
-        "system": system_prompt,
+        "max_tokens": max_tokens,
+        # The system prompts are large and static — mark them as a prompt-cache
+        # breakpoint so repeat calls within the cache TTL (e.g. the post-fix
+        # re-audit) are billed at the cached-input rate
+        "system": _system_blocks(system_prompt, cache_control),
         "messages": [{"role": "user", "content": user_message}],
     }
 
@@ -553,151 +691,550 @@ def call_claude(system_prompt: str, user_message: str, use_web_search: bool = Fa
         kwargs["tools"] = [{
             "type": "web_search_20250305",
             "name": "web_search",
-            "max_uses": 10,
+            "max_uses": web_search_max_uses,
         }]
 
-    # Retry up to 3 times with increasing delays for rate limits
-    max_retries = 3
-    for attempt in range(max_retries):
+    if output_tool:
+        kwargs.setdefault("tools", []).append(output_tool)
+        # Forcing the tool outright would skip the searches, so with web search the
+        # model picks when to submit; the prompts tell it to finish with this tool
+        if not use_web_search:
+            kwargs["tool_choice"] = {"type": "tool", "name": output_tool["name"]}
+
+    return kwargs
+
+
+# A forced output tool ends the turn with "tool_use" rather than "end_turn"
+_COMPLETE_STOP_REASONS = ("end_turn", "tool_use")
+
+
+def _response_text(message) -> str:
+    """Join the text blocks of a Messages API response, skipping tool-use blocks.
+    If the model called an output tool, that tool's input is returned as JSON instead."""
+    content = message.content
+    # Calls without tools come back as a single text block
+    if len(content) == 1 and content[0].type == "text":
+        return content[0].text
+    for block in content:
+        if block.type == "tool_use":
+            return _json_bytes(block.input).decode("utf-8")
+    return "\n".join(block.text for block in content if block.type == "text")
+
+
+def _cache_key(params: dict) -> str:
+    """Hash the full request (model, prompts, tools, limits) into a response cache key."""
+    return _content_hash(json.dumps(params, sort_keys=True).encode("utf-8"))
+
+
+def _content_hash(data: bytes) -> str:
+    """128-bit BLAKE2b fingerprint for cache keys and change detection (not security).
+    BLAKE2b is faster than SHA-256 on 64-bit CPUs and ships with hashlib."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _cacheable(use_web_search: bool, cache_ttl: timedelta | None) -> bool:
+    """Web-search answers depend on what is published today, so they are only cached
+    when the caller opts in with an explicit (short) cache_ttl, as the news scan does.
+    Otherwise regenerating a rejected Pass 1 draft would just return it again."""
+    return not use_web_search or cache_ttl is not None
+
+
+def _cache_get(key: str, ttl: timedelta | None = None) -> str | None:
+    """Return a cached response if one exists and is younger than ttl (default CACHE_TTL_DAYS).
+    Age is the file's mtime (when it was written); a hit bumps its atime, which is
+    what _prune_cache evicts by."""
+    if not USE_RESPONSE_CACHE:
+        return None
+    path = CACHE_DIR / f"{key}.txt.gz"
+    try:
+        written = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    now = datetime.now().timestamp()
+    if now - written > (ttl or timedelta(days=CACHE_TTL_DAYS)).total_seconds():
+        return None
+    try:
+        data = path.read_bytes()
+        os.utime(path, (now, written))
+    except FileNotFoundError:  # pruned by another thread in between
+        return None
+    return gzip.decompress(data).decode("utf-8")
+
+
+def atomic_write(path: Path, data: str | bytes):
+    """Write text (UTF-8) or bytes to path via a temp file and rename, so readers (the
+    dashboard, a rerun) never see a half-written file and a crash leaves the old version intact."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    # Every artifact is one complete blob, so skip the buffered file object and
+    # hand it straight to the kernel
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def copy_file(src: Path, dst: Path):
+    """Copy src to dst byte-for-byte without decoding it, via a temp file and rename
+    like atomic_write. On the same filesystem this is a hard link (no bytes moved);
+    that is safe because drafts are only ever replaced by rename, never rewritten in
+    place. Across filesystems it falls back to shutil.copyfile (sendfile on Linux)."""
+    tmp = dst.with_suffix(dst.suffix + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            raise
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _json_bytes(obj) -> bytes:
+    """Serialize a pipeline artifact (audit, social, checks, alert) as indented UTF-8 JSON.
+    Uses orjson when installed, which encodes straight to bytes in C."""
+    if orjson is None:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+
+def _json_body(obj) -> bytes:
+    """Compact JSON request body, encoded with orjson when installed."""
+    if orjson is None:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return orjson.dumps(obj)
+
+
+def _json_loads(data: str | bytes):
+    """Parse JSON with orjson when installed. Decode errors are json.JSONDecodeError
+    either way (orjson's error subclasses it)."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def read_json(path: Path):
+    """Parse a JSON file (with orjson when installed)."""
+    return _json_loads(path.read_bytes())
+
+
+def write_json(path: Path, obj):
+    """Atomically write obj to path as indented UTF-8 JSON."""
+    atomic_write(path, _json_bytes(obj))
+
+
+@functools.cache
+def _ensure_cache_dir():
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _cache_put(key: str, text: str):
+    """Store a response in the cache, gzip-compressed (generated HTML shrinks ~4x)."""
+    _ensure_cache_dir()
+    atomic_write(CACHE_DIR / f"{key}.txt.gz", gzip.compress(text.encode("utf-8"), compresslevel=6, mtime=0))
+    _prune_cache()
+
+
+def _prune_cache():
+    """Keep the cache at CACHE_MAX_ENTRIES files by deleting the least recently used
+    (oldest atime, set on write and on every hit). Runs after each write, i.e. once per
+    API call."""
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".txt.gz"):
+                try:
+                    entries.append((entry.stat().st_atime, entry.path))
+                except FileNotFoundError:
+                    pass
+    if len(entries) <= CACHE_MAX_ENTRIES:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - CACHE_MAX_ENTRIES]:
+        Path(path).unlink(missing_ok=True)
+
+
+def _stream_text_to_file(stream, path: Path):
+    """Write each text delta of a message stream to path as it arrives."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for chunk in stream.text_stream:
+            os.write(fd, chunk.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def call_claude(system_prompt: str | tuple[str, ...], user_message: str, use_web_search: bool = False,
+                model: str = CLAUDE_MODEL, max_tokens: int = 4096, web_search_max_uses: int = 10,
+                cache_ttl: timedelta | None = None, stream_to: Path | None = None,
+                prompt_cache_ttl: str | None = None, output_tool: dict | None = None) -> str:
+    """Call the Anthropic API using the official SDK. Supports web search for live research.
+    Retries rate limits, overloads and server errors with exponential backoff. Responses are cached on disk by
+    request hash, so re-running a pass with identical inputs costs nothing (web-search
+    calls only when cache_ttl is given).
+    If stream_to is given, text is appended to that file as it is generated (truncated
+    on each attempt), so a long generation is on disk before the call returns."""
+    import anthropic
+
+    kwargs = _build_request(system_prompt, user_message, use_web_search, web_search_max_uses,
+                            model=model, max_tokens=max_tokens, prompt_cache_ttl=prompt_cache_ttl,
+                            output_tool=output_tool)
+    key = _cache_key(kwargs)
+    cacheable = _cacheable(use_web_search, cache_ttl)
+    cached = _cache_get(key, cache_ttl) if cacheable else None
+    if cached is not None:
+        logger.info("✓ Claude response loaded from cache (%d chars)", len(cached))
+        return cached
+
+    # The loop below does its own backoff; SDK retries on top would compound the waits
+    client = _get_client().with_options(max_retries=0)
+
+    system_texts = (system_prompt,) if isinstance(system_prompt, str) else system_prompt
+    wait_for_rate_budget(kwargs["model"], _estimate_tokens(*system_texts, user_message))
+
+    logger.info("Calling Claude API (model: %s, web_search: %s)...", kwargs["model"], use_web_search)
+    flush_log()
+
+    # Retry rate limits (429), overloads (529), other 5xx errors and dropped connections
+    # with exponential backoff (10s, 20s, 40s, ... plus jitter), honouring retry-after
+    # when the API sends one; no single wait exceeds RETRY_MAX_WAIT
+    max_tries = 5
+    for attempt in range(max_tries):
         try:
-            response = client.messages.create(**kwargs)
+            # Stream the response so tokens arrive as they are generated instead of
+            # holding an idle connection open for the whole multi-minute generation
+            with _claude_slots, client.messages.stream(**kwargs) as stream:
+                if stream_to is not None:
+                    _stream_text_to_file(stream, stream_to)
+                response = stream.get_final_message()
+                _record_rate_limits(kwargs["model"], getattr(stream, "response", None))
             break
-        except anthropic.RateLimitError as e:
-            wait_time = 60 * (attempt + 1)  # 60s, 120s, 180s
-            print(f"  Rate limited (attempt {attempt + 1}/{max_retries}). Waiting {wait_time}s...")
-            time.sleep(wait_time)
-            if attempt == max_retries - 1:
-                print(f"  Rate limit persisted after {max_retries} retries.")
+        except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+            status = getattr(e, "status_code", None)
+            retryable = status is None or status == 429 or status >= 500
+            if not retryable or attempt == max_tries - 1:
+                logger.error("API Error: %s", e)
                 raise
-        except anthropic.APIError as e:
-            print(f"  API Error: {e}")
-            raise
+            wait_time = 10 * 2 ** attempt + random.uniform(0, 2)
+            response_obj = getattr(e, "response", None)
+            if response_obj is not None:
+                try:
+                    wait_time = float(response_obj.headers.get("retry-after") or wait_time)
+                except ValueError:
+                    pass
+            wait_time = min(wait_time, RETRY_MAX_WAIT)
+            logger.warning("API error %s (attempt %s/%s). Waiting %.0fs...",
+                           status or "connection", attempt + 1, max_tries, wait_time)
+            time.sleep(wait_time)
+
+    text = _response_text(response)
+    logger.info("API response received (%d chars, stop_reason: %s)", len(text), response.stop_reason)
+    usage = response.usage
+    logger.info("Tokens: %s in (%s cache read, %s cache write), %s out",
+                usage.input_tokens, getattr(usage, "cache_read_input_tokens", 0) or 0,
+                getattr(usage, "cache_creation_input_tokens", 0) or 0, usage.output_tokens)
+
+    # Don't cache truncated output — a rerun should get another chance at a full answer
+    if cacheable and response.stop_reason in _COMPLETE_STOP_REASONS:
+        _cache_put(key, text)
+    return text
+
+
+def call_claude_batch(requests: list[dict], poll_interval: int = 30,
+                      cache_ttl: timedelta | None = None,
+                      cancel: threading.Event | None = None) -> dict:
+    """Run several independent Claude calls through the Message Batches API (50% cheaper).
+    Each request is a dict with a "custom_id" plus the call_claude arguments
+    (system_prompt, user_message, use_web_search, web_search_max_uses, model, max_tokens,
+    output_tool).
+    Blocks until the batch has ended and returns {custom_id: text}; items that
+    errored or expired map to "". Only use this for work nobody is waiting on —
+    batches usually finish in minutes but can take up to 24 hours.
+    Cached responses are reused; only cache misses are submitted.
+    If cancel is set while the batch is pending, the batch is cancelled and only the
+    results available so far (the cached ones) are returned."""
+
+    results = {}
+    batch_requests = []
+    cache_keys = {}
+    for req in requests:
+        params = _build_request(**{k: v for k, v in req.items() if k != "custom_id"})
+        key = _cache_key(params)
+        cacheable = _cacheable(req.get("use_web_search", False), cache_ttl)
+        cached = _cache_get(key, cache_ttl) if cacheable else None
+        if cached is not None:
+            results[req["custom_id"]] = cached
+            continue
+        if cacheable:
+            cache_keys[req["custom_id"]] = key
+        batch_requests.append({"custom_id": req["custom_id"], "params": params})
+
+    if not batch_requests:
+        logger.info("✓ All %s batch requests loaded from cache", len(requests))
+        return results
+
+    client = _get_client()
+    batch = client.messages.batches.create(requests=batch_requests)
+    logger.info("Submitted Claude batch %s (%s requests)...", batch.id, len(batch_requests))
+    flush_log()
+
+    while batch.processing_status != "ended":
+        if cancel is not None and cancel.wait(poll_interval):
+            client.messages.batches.cancel(batch.id)
+            logger.info("Cancelled Claude batch %s", batch.id)
+            return results
+        if cancel is None:
+            time.sleep(poll_interval)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            message = entry.result.message
+            results[entry.custom_id] = _response_text(message)
+            if entry.custom_id in cache_keys and message.stop_reason in _COMPLETE_STOP_REASONS:
+                _cache_put(cache_keys[entry.custom_id], results[entry.custom_id])
+        else:
+            logger.warning("⚠ Batch request %s %s", entry.custom_id, entry.result.type)
+            results[entry.custom_id] = ""
+
+    counts = batch.request_counts
+    logger.info("Batch %s ended (%s succeeded, %s errored, %s expired)",
+                batch.id, counts.succeeded, counts.errored, counts.expired)
+    return results
 
-    # Extract text from content blocks
-    text_parts = []
-    for block in response.content:
-        if block.type == "text":
-            text_parts.append(block.text)
 
-    print(f"  API response received ({len(text_parts)} text blocks, "
-          f"stop_reason: {response.stop_reason})")
-    return "\n".join(text_parts)
+SMTP_TIMEOUT = 20  # seconds per SMTP connect/command
 
 
 def send_email(subject: str, body_text: str, body_html: str = ""):
-    """Send email via Resend HTTP API (primary) or Gmail SMTP (fallback).
+    """Send email via the Resend HTTP API, or Gmail SMTP when no Resend key is set.
     Resend works on Railway since it uses HTTPS, not SMTP ports."""
-    import httpx
+    send_emails([(subject, body_text, body_html)])
+
+
+def send_emails(messages: list[tuple[str, str, str]]):
+    """Send several (subject, body_text, body_html) emails at once: one Resend batch
+    request over the shared HTTP client, or (without a Resend key) a single Gmail
+    SMTP session that sends them all."""
+
+    if not messages:
+        return
 
-    # Try Resend API first (works on Railway — uses HTTPS)
+    # Resend over HTTPS reuses the pooled keep-alive connection. When a key is
+    # configured it is the only transport: SMTP ports are blocked on Railway, so
+    # falling back would just hang until the connect attempts time out.
     if RESEND_API_KEY:
+        payload = [{
+            "from": "PuertoRicoLLC Blog <onboarding@resend.dev>",
+            "to": [NOTIFY_EMAIL],
+            "subject": subject,
+            "text": body_text,
+            "html": body_html if body_html else body_text,
+        } for subject, body_text, body_html in messages]
         try:
-            resp = httpx.post(
-                "https://api.resend.com/emails",
+            body = _json_body(payload[0] if len(payload) == 1 else payload)
+            resp = _http_request(
+                "POST",
+                "https://api.resend.com/emails" if len(payload) == 1 else "https://api.resend.com/emails/batch",
                 headers={
                     "Authorization": f"Bearer {RESEND_API_KEY}",
                     "Content-Type": "application/json",
+                    # One key per send, reused by _http_request's retries: a retry after a
+                    # dropped response must not email twice, but a deliberate resend of
+                    # the same content (rerun, manual re-scan) must still go out
+                    "Idempotency-Key": uuid.uuid4().hex,
                 },
-                json={
-                    "from": "PuertoRicoLLC Blog <onboarding@resend.dev>",
-                    "to": [NOTIFY_EMAIL],
-                    "subject": subject,
-                    "text": body_text,
-                    "html": body_html if body_html else body_text,
-                },
-                timeout=30,
+                content=body,
             )
             if resp.status_code == 200:
-                print(f"  ✓ Email sent via Resend API")
+                logger.info("✓ %s email(s) sent via Resend API", len(payload))
                 return
             else:
-                print(f"  Resend error {resp.status_code}: {resp.text[:200]}")
+                logger.warning("Resend error %s: %s", resp.status_code, resp.text[:200])
         except Exception as e:
-            print(f"  Resend failed: {e}")
+            logger.warning("Resend failed: %s", e)
+        logger.error("✗ %s email(s) not sent", len(payload))
+        return
+
+    # No Resend key: Gmail SMTP (works outside Railway). On Railway the SMTP ports are
+    # blocked, so don't sit through connect timeouts on both ports just to fail.
+    if ON_RAILWAY:
+        logger.error("✗ %s email(s) not sent: SMTP is blocked on Railway — set RESEND_API_KEY",
+                     len(messages))
+        return
+
+    pending = []
+    for subject, body_text, body_html in messages:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = GMAIL_ADDRESS
+        msg["To"] = NOTIFY_EMAIL
+        msg.set_content(body_text)
+        if body_html:
+            msg.add_alternative(body_html, subtype="html")
+        pending.append(msg)
+
+    # The logged-in session is kept between calls; if it has gone stale mid-send,
+    # drop it and retry the remaining messages once on a fresh login
+    with _smtp_lock:
+        for attempt in range(2):
+            try:
+                server = _get_smtp()
+                if server is None:
+                    break
+                # Drop each message once it's accepted so a retry only resends the rest
+                while pending:
+                    server.send_message(pending[0])
+                    pending.pop(0)
+                logger.info("✓ %s email(s) sent via Gmail", len(messages))
+                return
+            except Exception as e:
+                logger.warning("Gmail send failed (attempt %s/2): %s", attempt + 1, e)
+                _close_smtp()
+
+    logger.error("✗ All email methods failed (%s of %s unsent)", len(pending), len(messages))
+
+
+_smtp_conn = None
+_smtp_lock = threading.Lock()
 
-    # Fallback: Gmail SMTP (works outside Railway)
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"] = GMAIL_ADDRESS
-    msg["To"] = NOTIFY_EMAIL
-    msg.attach(MIMEText(body_text, "plain"))
-    if body_html:
-        msg.attach(MIMEText(body_html, "html"))
+
+def _get_smtp():
+    """Return the cached Gmail SMTP session if it still answers NOOP, otherwise log in
+    again (STARTTLS on 587, then SSL on 465). Returns None if both ports fail.
+    Callers hold _smtp_lock."""
+    global _smtp_conn
+
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPException, OSError):
+            pass
+        _close_smtp()
 
     for port, method in [(587, "TLS"), (465, "SSL")]:
         try:
             if port == 587:
-                with smtplib.SMTP("smtp.gmail.com", 587, timeout=30) as server:
-                    server.starttls()
-                    server.login(GMAIL_ADDRESS, GMAIL_APP_PASSWORD)
-                    server.sendmail(GMAIL_ADDRESS, NOTIFY_EMAIL, msg.as_string())
+                server = smtplib.SMTP("smtp.gmail.com", 587, timeout=SMTP_TIMEOUT)
+                server.starttls()
             else:
-                with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=30) as server:
-                    server.login(GMAIL_ADDRESS, GMAIL_APP_PASSWORD)
-                    server.sendmail(GMAIL_ADDRESS, NOTIFY_EMAIL, msg.as_string())
-            print(f"  ✓ Email sent via Gmail port {port} ({method})")
-            return
+                server = smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=SMTP_TIMEOUT)
+            server.login(GMAIL_ADDRESS, GMAIL_APP_PASSWORD)
+            logger.info("Gmail SMTP session opened on port %s (%s)", port, method)
+            _smtp_conn = server
+            return server
         except Exception as e:
-            print(f"  Gmail port {port} failed: {e}")
+            logger.warning("Gmail port %s failed: %s", port, e)
+    return None
 
-    print("  ✗ All email methods failed")
 
+@atexit.register
+def _close_smtp():
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except Exception:
+            pass
+        _smtp_conn = None
 
-def push_to_github(filename: str, content: str, commit_message: str = "") -> bool:
-    """Push a file to the GitHub repo (livewebsites) via the GitHub API.
-    This deploys the blog post to the live site via Hostinger's Git integration."""
-    import httpx
+
+_email_threads: list[threading.Thread] = []
+_email_threads_lock = threading.Lock()
+
+
+def send_email_async(subject: str, body_text: str, body_html: str = "") -> threading.Thread:
+    """Send an email on a background thread so the caller doesn't wait on the
+    Resend/SMTP round-trip. Sends still in flight are joined at interpreter exit."""
+    thread = threading.Thread(target=send_email, args=(subject, body_text, body_html), daemon=True)
+    thread.start()
+    with _email_threads_lock:
+        # Drop finished sends so the list doesn't grow for the life of the dashboard
+        _email_threads[:] = [t for t in _email_threads if t.is_alive()]
+        _email_threads.append(thread)
+    return thread
+
+
+@atexit.register
+def _flush_email_threads(timeout: float = 30):
+    with _email_threads_lock:
+        pending = list(_email_threads)
+    for thread in pending:
+        thread.join(timeout)
+
+
+def push_files_to_github(files: dict[str, str], commit_message: str) -> bool:
+    """Push several files to the GitHub repo as a single commit via the Git data API
+    (ref → tree → commit → ref update). Hostinger deploys once, and the site never
+    sees some of the files without the others."""
 
     if not GITHUB_TOKEN or not GITHUB_REPO:
-        print("  ✗ GitHub push skipped: GITHUB_TOKEN or GITHUB_REPO not set")
+        logger.error("✗ GitHub push skipped: GITHUB_TOKEN or GITHUB_REPO not set")
         return False
 
-    if not commit_message:
-        commit_message = f"Publish blog post: {filename}"
-
-    api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{filename}"
+    api_url = f"https://api.github.com/repos/{GITHUB_REPO}/git"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json",
     }
 
-    import base64
-    encoded_content = base64.b64encode(content.encode("utf-8")).decode("utf-8")
-
-    # Check if file already exists (need SHA to update)
-    sha = None
-    try:
-        resp = httpx.get(api_url, headers=headers, timeout=30)
-        if resp.status_code == 200:
-            sha = resp.json().get("sha")
-    except Exception:
-        pass
-
-    body = {
-        "message": commit_message,
-        "content": encoded_content,
-        "branch": "main",
-    }
-    if sha:
-        body["sha"] = sha
-
     try:
-        resp = httpx.put(api_url, headers=headers, json=body, timeout=30)
-        if resp.status_code in (200, 201):
-            print(f"  ✓ Pushed to GitHub: {filename}")
-            return True
-        else:
-            print(f"  ✗ GitHub push failed ({resp.status_code}): {resp.text[:200]}")
-            return False
+        resp = _http_request("GET", f"{api_url}/ref/heads/main", headers=headers)
+        resp.raise_for_status()
+        head_sha = resp.json()["object"]["sha"]
+        resp = _http_request("GET", f"{api_url}/commits/{head_sha}", headers=headers)
+        resp.raise_for_status()
+        base_tree = resp.json()["tree"]["sha"]
+
+        # Tree entries can carry the file content inline, so no per-file blob calls
+        resp = _http_request("POST", f"{api_url}/trees", headers=headers, content=_json_body({
+            "base_tree": base_tree,
+            "tree": [{"path": name, "mode": "100644", "type": "blob", "content": content}
+                     for name, content in files.items()],
+        }))
+        resp.raise_for_status()
+        resp = _http_request("POST", f"{api_url}/commits", headers=headers, content=_json_body({
+            "message": commit_message,
+            "tree": resp.json()["sha"],
+            "parents": [head_sha],
+        }))
+        resp.raise_for_status()
+        resp = _http_request("PATCH", f"{api_url}/refs/heads/main", headers=headers,
+                             content=_json_body({"sha": resp.json()["sha"]}))
+        resp.raise_for_status()
     except Exception as e:
-        print(f"  ✗ GitHub push error: {e}")
+        logger.error("✗ GitHub push failed: %s", e)
         return False
 
+    logger.info("✓ Pushed to GitHub in one commit: %s", ", ".join(files))
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_calendar(mtime_ns: int) -> dict:
+    return read_json(CALENDAR_PATH)
+
 
 def load_calendar() -> dict:
-    """Load the content calendar JSON."""
-    with open(CALENDAR_PATH) as f:
-        return json.load(f)
+    """Load the content calendar JSON. The parse is cached and shared by every caller
+    until the file's mtime changes, so treat the result as read-only."""
+    return _parse_calendar(CALENDAR_PATH.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=1)
+def _index_calendar(mtime_ns: int) -> dict:
+    return {post["slug"]: post for post in _parse_calendar(mtime_ns).get("posts", [])}
+
+
+def find_post(slug: str) -> dict | None:
+    """Look up a calendar post by slug. The slug index is built once per calendar
+    version alongside the parse, instead of scanning the post list on every lookup."""
+    return _index_calendar(CALENDAR_PATH.stat().st_mtime_ns).get(slug)
 
 
 # Color mapping for blog card gradients by cluster
@@ -719,15 +1256,12 @@ CLUSTER_CATEGORIES = {
 }
 
 
-def update_blog_index(post: dict, calendar: dict) -> bool:
-    """Fetch blog.html from GitHub, inject a new article entry into the JS array, and push it back.
-    This keeps the blog index page up to date automatically when articles are approved."""
-    import httpx
-    import base64
+def _fetch_blog_index() -> str | None:
+    """Fetch blog.html from GitHub. Returns its HTML, or None on failure."""
 
     if not GITHUB_TOKEN or not GITHUB_REPO:
-        print("  ✗ Blog index update skipped: no GitHub credentials")
-        return False
+        logger.error("✗ Blog index update skipped: no GitHub credentials")
+        return None
 
     api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/blog.html"
     headers = {
@@ -735,23 +1269,34 @@ def update_blog_index(post: dict, calendar: dict) -> bool:
         "Accept": "application/vnd.github.v3+json",
     }
 
-    # Fetch current blog.html
     try:
-        resp = httpx.get(api_url, headers=headers, timeout=30)
+        resp = _http_request("GET", api_url, headers=headers)
         if resp.status_code != 200:
-            print(f"  ✗ Could not fetch blog.html ({resp.status_code})")
-            return False
-        file_data = resp.json()
-        sha = file_data["sha"]
-        blog_html = base64.b64decode(file_data["content"]).decode("utf-8")
+            logger.error("✗ Could not fetch blog.html (%s)", resp.status_code)
+            return None
+        return base64.b64decode(resp.json()["content"]).decode("utf-8")
     except Exception as e:
-        print(f"  ✗ Error fetching blog.html: {e}")
-        return False
+        logger.error("✗ Error fetching blog.html: %s", e)
+        return None
+
+
+# One entry of the `const articles = [...]` array in blog.html
+_BLOG_INDEX_ENTRY_TEMPLATE = string.Template("""        {
+            category: "$category",
+            color: "$color",
+            tagEN: "$tag_en", tagES: "$tag_es",
+            titleEN: "$title_en",
+            titleES: "$title_es",
+            date: "$date_en", dateES: "$date_es", readTime: $read_time,
+            descEN: "Read the full article for expert analysis on this topic with real-world examples and official source citations.",
+            descES: "Lea el art\\u00edculo completo para an\\u00e1lisis experto con ejemplos reales y citas de fuentes oficiales.",
+            url: "$slug.html"
+        },""")
 
-    # Check if article already exists in the array
-    if post["slug"] in blog_html:
-        print(f"  ℹ Article already in blog index: {post['slug']}")
-        return True
+
+def add_to_blog_index(blog_html: str, post: dict, calendar: dict) -> str | None:
+    """Return blog.html with a new article entry injected at the top of its JS array,
+    or None if the array can't be found."""
 
     # Build the new article entry
     cluster = post.get("cluster", "4_tax_strategy")
@@ -760,9 +1305,7 @@ def update_blog_index(post: dict, calendar: dict) -> bool:
     color = CLUSTER_COLORS.get(cluster, "from-blue-600 to-blue-500")
     tag_en = cluster_info.get("category_label_en", "Tax Strategy")
     tag_es = cluster_info.get("category_label_es", "Estrategia Fiscal")
-    today = datetime.now()
-    date_en = today.strftime("%B %d, %Y")
-    date_es = today.strftime("%d %B %Y")
+    date_en, date_es = format_post_dates(datetime.now())
 
     # Escape quotes in titles for JS
     title_en = post["title_en"].replace('"', '\\"')
@@ -778,84 +1321,79 @@ def update_blog_index(post: dict, calendar: dict) -> bool:
             article_html = p.read_text(encoding="utf-8")
             break
     # Strip HTML tags to get plain text, count words, divide by 200 wpm
-    plain_text = re.sub(r'<[^>]+>', ' ', article_html)
-    plain_text = re.sub(r'\s+', ' ', plain_text).strip()
+    plain_text = _TAG_RE.sub(" ", article_html)
+    plain_text = _WHITESPACE_RE.sub(" ", plain_text).strip()
     word_count = len(plain_text.split())
     read_time = max(1, round(word_count / 200))
 
-    new_entry = f"""        {{
-            category: "{category}",
-            color: "{color}",
-            tagEN: "{tag_en}", tagES: "{tag_es}",
-            titleEN: "{title_en}",
-            titleES: "{title_es}",
-            date: "{date_en}", dateES: "{date_es}", readTime: {read_time},
-            descEN: "Read the full article for expert analysis on this topic with real-world examples and official source citations.",
-            descES: "Lea el art\\u00edculo completo para an\\u00e1lisis experto con ejemplos reales y citas de fuentes oficiales.",
-            url: "{post['slug']}.html"
-        }},"""
+    new_entry = _BLOG_INDEX_ENTRY_TEMPLATE.substitute(
+        category=category, color=color, tag_en=tag_en, tag_es=tag_es,
+        title_en=title_en, title_es=title_es, date_en=date_en, date_es=date_es,
+        read_time=read_time, slug=post["slug"],
+    )
 
     # Inject at the top of the articles array (after "const articles = [")
     marker = "const articles = ["
     idx = blog_html.find(marker)
     if idx == -1:
-        print("  ✗ Could not find articles array in blog.html")
-        return False
+        logger.error("✗ Could not find articles array in blog.html")
+        return None
 
     insert_pos = idx + len(marker) + 1  # +1 for newline
-    updated_html = blog_html[:insert_pos] + new_entry + "\n" + blog_html[insert_pos:]
-
-    # Push updated blog.html
-    encoded = base64.b64encode(updated_html.encode("utf-8")).decode("utf-8")
-    body = {
-        "message": f"Add blog card: {post['slug']}",
-        "content": encoded,
-        "sha": sha,
-        "branch": "main",
-    }
+    return blog_html[:insert_pos] + new_entry + "\n" + blog_html[insert_pos:]
 
-    try:
-        resp = httpx.put(api_url, headers=headers, json=body, timeout=30)
-        if resp.status_code in (200, 201):
-            print(f"  ✓ Blog index updated with new article: {post['slug']}")
-            return True
+
+def publish_post(slug: str, html: str) -> bool:
+    """Push an approved article and its blog index card to GitHub in one commit."""
+    files = {f"{slug}.html": html}
+
+    post = find_post(slug)
+    blog_html = _fetch_blog_index() if post else None
+    if not post:
+        logger.warning("⚠ Post %s not found in calendar — blog index not updated", slug)
+    elif blog_html is not None:
+        if slug in blog_html:
+            logger.info("ℹ Article already in blog index: %s", slug)
         else:
-            print(f"  ✗ Blog index push failed ({resp.status_code}): {resp.text[:200]}")
-            return False
-    except Exception as e:
-        print(f"  ✗ Blog index update error: {e}")
-        return False
+            updated_html = add_to_blog_index(blog_html, post, load_calendar())
+            if updated_html is not None:
+                files["blog.html"] = updated_html
 
+    return push_files_to_github(files, f"Publish: {slug}")
 
-def get_next_scheduled_post(calendar: dict) -> dict | None:
-    """Determine which post to generate based on today's date and day of week."""
-    today = datetime.now()
-    day_name = today.strftime("%A").lower()
 
-    day_map = {"monday": "monday", "wednesday": "wednesday", "friday": "friday"}
-    if day_name not in day_map:
-        return None
+def _generated_slugs() -> set[str]:
+    """Slugs that already have a draft or approved HTML file.
+    One directory listing per folder instead of two stat() calls per calendar post."""
+    slugs = set()
+    for folder in [DRAFTS_DIR, APPROVED_DIR]:
+        if not folder.exists():
+            continue
+        with os.scandir(folder) as entries:
+            slugs.update(e.name.removesuffix(".html") for e in entries if e.name.endswith(".html"))
+    return slugs
 
-    # Find posts for today's day that haven't been generated yet
-    for post in calendar["posts"]:
-        if post["day"] == day_name:
-            draft_path = DRAFTS_DIR / f"{post['slug']}.html"
-            approved_path = APPROVED_DIR / f"{post['slug']}.html"
-            if not draft_path.exists() and not approved_path.exists():
-                return post
 
-    return None
+def _first_ungenerated_post(calendar: dict, day: str | None = None) -> dict | None:
+    """First calendar post (optionally only those for `day`) without a draft or approved
+    file. Calendar order is publication order, so this stops at the first hit."""
+    generated = _generated_slugs()
+    return next((post for post in calendar["posts"]
+                 if post["slug"] not in generated and (day is None or post["day"] == day)), None)
+
+
+def get_next_scheduled_post(calendar: dict) -> dict | None:
+    """Determine which post to generate based on today's date and day of week."""
+    day_name = datetime.now().strftime("%A").lower()
+    if day_name not in ("monday", "wednesday", "friday"):
+        return None
+    return _first_ungenerated_post(calendar, day_name)
 
 
 def get_next_ungenerated_post(calendar: dict) -> dict | None:
     """Get the next post that hasn't been generated yet, regardless of day.
     Used for manual 'Generate Now' triggers."""
-    for post in calendar["posts"]:
-        draft_path = DRAFTS_DIR / f"{post['slug']}.html"
-        approved_path = APPROVED_DIR / f"{post['slug']}.html"
-        if not draft_path.exists() and not approved_path.exists():
-            return post
-    return None
+    return _first_ungenerated_post(calendar)
 
 
 # ---------------------------------------------------------------------------
@@ -904,21 +1442,23 @@ HERO_IMAGE_POOL = [
 def select_hero_image(post: dict, calendar: dict) -> dict:
     """Select a unique hero image for this post based on its cluster.
     Ensures no two articles use the same image by tracking what's been used."""
-    import hashlib
 
     category = calendar["clusters"][post["cluster"]]["category_tag"]
 
-    # Track which images have already been used (by checking approved + draft files)
+    # Track which images have already been used (by checking approved + draft files).
+    # Files are searched as memory-mapped bytes — no read into a str or UTF-8 decode.
+    image_urls = [(img["id"], img["url"].encode("utf-8")) for img in HERO_IMAGE_POOL]
     used_images = set()
     for folder in [DRAFTS_DIR, APPROVED_DIR]:
         if folder.exists():
             for f in folder.glob("*.html"):
                 try:
-                    content = f.read_text(encoding="utf-8")
-                    for img in HERO_IMAGE_POOL:
-                        if img["url"] in content:
-                            used_images.add(img["id"])
-                except:
+                    with open(f, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                        for img_id, url in image_urls:
+                            if content.find(url) != -1:
+                                used_images.add(img_id)
+                except (OSError, ValueError):
+                    # ValueError: empty files can't be mapped
                     pass
 
     # First: try images themed for this category that haven't been used
@@ -949,16 +1489,18 @@ def select_hero_image(post: dict, calendar: dict) -> dict:
 # PASS 1 — RESEARCH & GENERATE
 # ---------------------------------------------------------------------------
 
-def pass1_generate(post: dict, calendar: dict) -> str:
-    """Generate the blog post HTML using Claude API with web search for source verification."""
+def pass1_generate(post: dict, calendar: dict, now: datetime | None = None) -> str:
+    """Generate the blog post HTML using Claude API with web search for source verification.
+    `now` is the pipeline's publish timestamp (defaults to the current time)."""
 
+    now = now or datetime.now()
     cluster_info = calendar["clusters"][post["cluster"]]
 
     # Select hero image — rotate by cluster so no two articles in the same
     # category use the same image, and different categories feel visually distinct.
     hero_image = select_hero_image(post, calendar)
 
-    user_message = f"""Generate a complete blog post HTML file for PuertoRicoLLC.com.
+    user_message = f"""Write the content for a blog post on PuertoRicoLLC.com.
 
 ## POST DETAILS
 - Title (EN): {post['title_en']}
@@ -970,50 +1512,114 @@ def pass1_generate(post: dict, calendar: dict) -> str:
 - Target keywords: {post['keywords']}
 - Required sources to cite: {json.dumps(post['sources_required'])}
 - CTA service: {post.get('cta', cluster_info['cta_service'])}
-- Publish date: {datetime.now().strftime('%B %d, %Y')}
+- Publish date: {now.strftime('%B %d, %Y')}
 - Full URL: {SITE_URL}/{post['slug']}.html
 
-## HERO IMAGE (MANDATORY — use these exact values)
-- Image URL: {hero_image['url']}
-- Image alt text: {hero_image['alt']}
-Replace {{{{HERO_IMAGE_URL}}}} with: {hero_image['url']}
-Replace {{{{HERO_IMAGE_ALT}}}} with: {hero_image['alt']}
-
 ## INSTRUCTIONS
 1. FIRST, use web search to find the CURRENT text/provisions of each required source.
    Search for the actual government publications. Do NOT rely on memory for any numbers.
 2. Write a comprehensive 2,000-2,500 word article in English.
 3. Include at least 3 real-world examples with dollar amounts.
 4. Cite every factual claim with the specific law section or government source.
-5. Include a Sources & References section at the bottom with URLs.
-6. Use the EXACT HTML template provided in your system prompt. Do not invent your own layout.
+5. Put the Sources & References links in <sources_list>.
+6. Follow the OUTPUT FORMAT in your system prompt. Do not write the page layout.
 
-Output ONLY the complete HTML file. No explanation, no analysis, no preamble.
-Start with <!DOCTYPE html> and end with </html>.
+Output ONLY the tagged fields. No explanation, no analysis, no preamble.
 """
 
-    print(f"  [Pass 1] Hero image: {hero_image['url']}")
-    print("  [Pass 1] Generating blog post with web search for source verification...")
-    html = call_claude(PASS1_SYSTEM_PROMPT, user_message, use_web_search=True)
-
-    # Clean any markdown fencing if present
-    html = re.sub(r"^```html?\s*", "", html, flags=re.MULTILINE)
-    html = re.sub(r"```\s*$", "", html, flags=re.MULTILINE)
-
-    # Extract ONLY the HTML — Claude sometimes prepends analysis text
-    html_match = re.search(r"(<!DOCTYPE html.*</html>)", html, re.DOTALL | re.IGNORECASE)
-    if html_match:
-        html = html_match.group(1).strip()
-    else:
-        html = html.strip()
-
-    return html
+    logger.info("[Pass 1] Hero image: %s", hero_image["url"])
+    logger.info("[Pass 1] Generating blog post with web search for source verification...")
+    # The raw response streams into a .partial file next to the draft while it is
+    # generated; the assembled draft replaces it once the call completes
+    partial_path = DRAFTS_DIR / f"{post['slug']}.html.partial"
+    # Each search is a serial round trip inside the turn; budget roughly one per
+    # required source plus a couple of follow-ups instead of a flat 10
+    search_budget = min(10, len(post["sources_required"]) + 2)
+    response = call_claude(PASS1_SYSTEM_PROMPT, user_message, use_web_search=True, max_tokens=16000,
+                           web_search_max_uses=search_budget, stream_to=partial_path)
+    partial_path.unlink(missing_ok=True)
+
+    fields = _parse_article_fields(response)
+    if "article_body" not in fields:
+        # The model ignored the field format and wrote a whole page — keep it
+        logger.warning("[Pass 1] ⚠️ No <article_body> field in response, using raw HTML")
+        html = _strip_fences(response)
+        html_match = _HTML_DOC_RE.search(html)
+        return html_match.group(1).strip() if html_match else html.strip()
+
+    return render_article(post, cluster_info, hero_image, fields, day=now)
+
+
+_ARTICLE_FIELD_RE = re.compile(
+    r"<(meta_description|read_time|cta_title|cta_description|article_body|sources_list)>"
+    r"(.*?)</\1>",
+    re.DOTALL,
+)
+
+
+def _parse_article_fields(text: str) -> dict:
+    """Pull the tagged content fields out of a Pass 1 response."""
+    return {m.group(1): m.group(2).strip() for m in _ARTICLE_FIELD_RE.finditer(text)}
+
+
+def _json_ld_string(value: str) -> str:
+    """Encode a value for a string slot inside the JSON-LD <script> block."""
+    return json.dumps(value, ensure_ascii=False)[1:-1].replace("</", "<\\/")
+
+
+def render_article(post: dict, cluster_info: dict, hero_image: dict, fields: dict,
+                   day: datetime | None = None) -> str:
+    """Fill ARTICLE_TEMPLATE with the post metadata and the model-written fields."""
+    day = day or datetime.now()
+    body = fields["article_body"]
+    read_time = fields.get("read_time", "")
+    if not read_time.isdigit():
+        read_time = str(max(1, round(len(_TAG_RE.sub(" ", body).split()) / 230)))
+    meta_description = fields.get("meta_description") or post["title_en"]
+    esc = functools.partial(html_lib.escape, quote=True)
+    return ARTICLE_TEMPLATE.substitute(
+        title_en=esc(post["title_en"]),
+        title_es=esc(post["title_es"]),
+        headline_json=_json_ld_string(post["title_en"]),
+        title_encoded=quote(post["title_en"]),
+        meta_description=esc(meta_description),
+        meta_description_json=_json_ld_string(meta_description),
+        keywords=esc(post["keywords"]),
+        url=f"{SITE_URL}/{post['slug']}.html",
+        hero_image_url=esc(hero_image["url"]),
+        hero_image_alt=esc(hero_image["alt"]),
+        category_en=esc(cluster_info["category_label_en"]),
+        category_es=esc(cluster_info["category_label_es"]),
+        publish_date=day.strftime("%B %d, %Y"),
+        publish_date_iso=day.strftime("%Y-%m-%d"),
+        read_time=read_time,
+        article_body=body,
+        sources_list=fields.get("sources_list", ""),
+        cta_title=esc(fields.get("cta_title") or "Ready to Get Started?"),
+        cta_description=esc(fields.get("cta_description", "")),
+        gtag_html=_GTAG_HTML,
+        disclaimer_html=_DISCLAIMER_HTML,
+    )
 
 
 # ---------------------------------------------------------------------------
 # PASS 2 — ADVERSARIAL FACT-CHECK AUDIT
 # ---------------------------------------------------------------------------
 
+def _minify_html(html: str) -> str:
+    """Drop comments and indentation and shrink whitespace between tags to one space. Used only
+    for HTML sent to the model (never for published pages): the generated pages are
+    mostly indentation, which costs input tokens without telling the auditor anything.
+    A single space is kept because between inline elements it separates words
+    ("<strong>Act 60</strong> <a>...") and <pre> blocks are left untouched."""
+    parts = _PRE_BLOCK_RE.split(html)
+    # split() with a capturing group puts the <pre> blocks at the odd indexes
+    for i in range(0, len(parts), 2):
+        part = _LEADING_SPACE_RE.sub("", _HTML_COMMENT_RE.sub("", parts[i]))
+        parts[i] = _INTER_TAG_SPACE_RE.sub("> <", part)
+    return "".join(parts).strip()
+
+
 def pass2_audit(html: str, post: dict) -> dict:
     """Run an adversarial fact-check audit on the generated blog post."""
 
@@ -1025,48 +1631,23 @@ def pass2_audit(html: str, post: dict) -> dict:
 - Required sources: {json.dumps(post['sources_required'])}
 
 ## BLOG POST HTML
-{html}
+{_minify_html(html)}
 
-Conduct your full audit and respond ONLY with the JSON audit report.
+Conduct your full audit, then submit the report with the submit_audit tool.
 """
 
-    print("  [Pass 2] Running adversarial fact-check audit...")
-    raw = call_claude(PASS2_AUDIT_PROMPT, user_message, use_web_search=True)
+    logger.info("[Pass 2] Running adversarial fact-check audit...")
+    # The post-fix re-audit comes back more than 5 minutes later (rate-limit waits plus
+    # Pass 3), so keep the audit prompt cached for an hour to make that call a cache read
+    raw = call_claude(PASS2_AUDIT_PROMPT, user_message, use_web_search=True, max_tokens=4000,
+                      model=CLAUDE_AUDIT_MODEL, prompt_cache_ttl="1h", output_tool=AUDIT_TOOL)
 
     # Robust JSON extraction — handle markdown fences, preamble text, etc.
-    audit = None
-
-    # Strategy 1: Try to find JSON block between ```json ... ```
-    json_block_match = re.search(r'```json?\s*\n?(.*?)\n?\s*```', raw, re.DOTALL)
-    if json_block_match:
-        try:
-            audit = json.loads(json_block_match.group(1).strip())
-        except json.JSONDecodeError:
-            pass
-
-    # Strategy 2: Try to find first { ... } block (greedy, outermost braces)
-    if audit is None:
-        brace_match = re.search(r'\{.*\}', raw, re.DOTALL)
-        if brace_match:
-            try:
-                audit = json.loads(brace_match.group(0))
-            except json.JSONDecodeError:
-                pass
-
-    # Strategy 3: Strip common prefixes and try raw parse
-    if audit is None:
-        cleaned = raw.strip()
-        cleaned = re.sub(r"^```json?\s*", "", cleaned, flags=re.MULTILINE)
-        cleaned = re.sub(r"```\s*$", "", cleaned, flags=re.MULTILINE)
-        cleaned = cleaned.strip()
-        try:
-            audit = json.loads(cleaned)
-        except json.JSONDecodeError:
-            pass
+    audit = _extract_json_object(raw)
 
     # Fallback: return the raw response so user can see what the API actually said
     if audit is None:
-        print(f"  ⚠ Could not parse audit JSON. Raw response preview: {raw[:500]}")
+        logger.warning("⚠ Could not parse audit JSON. Raw response preview: %s", raw[:500])
         audit = {
             "overall_grade": "UNKNOWN",
             "publish_ready": False,
@@ -1076,6 +1657,27 @@ Conduct your full audit and respond ONLY with the JSON audit report.
             "raw_response": raw[:3000],
         }
 
+    return _normalize_audit(audit)
+
+
+_AUDIT_LIST_FIELDS = ("critical_issues", "warnings", "suggestions", "sources_verified", "spanish_issues")
+
+
+def _normalize_audit(audit: dict) -> dict:
+    """Coerce a parsed audit to the shape the pipeline, emails and dashboard expect.
+    Fallback (non-tool) responses can omit fields, use null, or give bare strings
+    as issues; any of those would otherwise surface later as a KeyError or TypeError."""
+    audit = dict(audit)
+    audit["overall_grade"] = str(audit.get("overall_grade") or "UNKNOWN")
+    # Only an explicit yes opens the publish gate; bool("false") would be True
+    ready = audit.get("publish_ready")
+    audit["publish_ready"] = ready is True or (isinstance(ready, str) and ready.strip().lower() == "true")
+    for field in _AUDIT_LIST_FIELDS:
+        items = audit.get(field) or []
+        if not isinstance(items, list):
+            items = [items]
+        audit[field] = [item if isinstance(item, dict) else {"issue": str(item)}
+                        for item in items if item is not None]
     return audit
 
 
@@ -1083,38 +1685,103 @@ Conduct your full audit and respond ONLY with the JSON audit report.
 # PASS 3 — AUTO-FIX CRITICAL ISSUES
 # ---------------------------------------------------------------------------
 
+def _insert_before(html: str, markers: tuple[str, ...], block: str) -> str | None:
+    """Insert block before the first marker found in html, or None if none is."""
+    lowered = html.lower()
+    for marker in markers:
+        idx = lowered.find(marker.lower())
+        if idx != -1:
+            return html[:idx] + block + html[idx:]
+    return None
+
+
+# Critical issues that are just a missing fixed block: (issue pattern, block still
+# missing?, patch). Patching these locally saves a Pass 3 call and the re-audit.
+_LOCAL_FIXES = [
+    (re.compile(r"google analytics|gtag|tracking (code|script)", re.IGNORECASE),
+     lambda html: "googletagmanager.com/gtag/js" not in html,
+     lambda html: _insert_before(html, ("</head>",), _GTAG_HTML)),
+    (re.compile(r"disclaimer", re.IGNORECASE),
+     lambda html: "disclaimer" not in html.lower(),
+     lambda html: _insert_before(html, ("<!-- CTA -->", "</article>", "</body>"), _DISCLAIMER_HTML)),
+]
+
+
+def _try_local_fix(html: str, critical_issues: list) -> tuple[str, list, list]:
+    """Patch critical issues that only need a fixed block from the page template.
+    Returns (html, unresolved_issues, fixed_issues); anything not matched by a
+    local fix is left for Pass 3."""
+    remaining, fixed = [], []
+    for issue in critical_issues:
+        if isinstance(issue, dict):
+            text = " ".join(str(issue.get(k, "")) for k in ("issue", "fix", "location"))
+        else:
+            text = str(issue)
+        for pattern, is_missing, patch in _LOCAL_FIXES:
+            if pattern.search(text) and is_missing(html):
+                patched = patch(html)
+                if patched is not None:
+                    html = patched
+                    fixed.append(issue)
+                    break
+        else:
+            remaining.append(issue)
+    return html, remaining, fixed
+
+
+_ARTICLE_ELEMENT_RE = re.compile(r"<article\b.*</article>", re.DOTALL | re.IGNORECASE)
+
+
 def pass3_fix(html: str, audit: dict, post: dict) -> str:
     """Fix critical issues found during the audit."""
 
     if not audit.get("critical_issues"):
         return html
 
+    # The page chrome around <article> comes from ARTICLE_TEMPLATE and is never what
+    # the audit flags, so only the article element goes through the model and the
+    # corrected element is spliced back into the page
+    article = _ARTICLE_ELEMENT_RE.search(html)
+    if article:
+        original, what = article.group(0), "<article> element"
+        output_rule = "Start with <article and end with </article>."
+        result_re = _ARTICLE_ELEMENT_RE
+    else:
+        original, what = html, "complete HTML file"
+        output_rule = "Start with <!DOCTYPE html> and end with </html>."
+        result_re = _HTML_DOC_RE
+
     user_message = f"""Fix the following critical issues in this blog post.
 
 ## CRITICAL ISSUES TO FIX
 {json.dumps(audit['critical_issues'], indent=2)}
 
 ## ORIGINAL HTML
-{html}
+{original}
 
-Output ONLY the corrected complete HTML file. No explanation, no analysis, no preamble.
-Start with <!DOCTYPE html> and end with </html>.
+Output ONLY the corrected {what}. No explanation, no analysis, no preamble.
+{output_rule}
 """
 
-    print("  [Pass 3] Fixing critical issues...")
-    fixed = call_claude(PASS3_FIX_PROMPT, user_message, use_web_search=False)
+    logger.info("[Pass 3] Fixing critical issues (%s, %d chars)...", what, len(original))
+    # Like Pass 1, stream the rewrite to disk so a crash mid-generation leaves it inspectable
+    partial_path = DRAFTS_DIR / f"{post['slug']}.fix.partial"
+    fixed = call_claude(PASS3_FIX_PROMPT, user_message, use_web_search=False, max_tokens=16000,
+                        stream_to=partial_path)
+    partial_path.unlink(missing_ok=True)
 
     # Strip markdown fences
-    fixed = re.sub(r"^```html?\s*", "", fixed, flags=re.MULTILINE)
-    fixed = re.sub(r"```\s*$", "", fixed, flags=re.MULTILINE)
+    fixed = _strip_fences(fixed)
 
     # Extract ONLY the HTML — Claude sometimes prepends analysis text
-    html_match = re.search(r"(<!DOCTYPE html.*</html>)", fixed, re.DOTALL | re.IGNORECASE)
+    html_match = result_re.search(fixed)
     if html_match:
+        if article:
+            return html[:article.start()] + html_match.group(0).strip() + html[article.end():]
         return html_match.group(1).strip()
 
     # If no valid HTML found, return original to avoid corruption
-    print("  ⚠ Pass 3 did not return valid HTML — keeping original")
+    logger.warning("⚠ Pass 3 did not return valid HTML — keeping original")
     return html
 
 
@@ -1122,8 +1789,62 @@ Start with <!DOCTYPE html> and end with </html>.
 # PASS 4 — SOCIAL MEDIA DERIVATIVES
 # ---------------------------------------------------------------------------
 
-def pass4_social(html: str, post: dict) -> dict:
-    """Generate social media derivative content from the approved blog post."""
+_PAGE_CHROME_RE = re.compile(r"<(head|script|style|nav|footer)\b[^>]*>.*?</\1>", re.DOTALL | re.IGNORECASE)
+
+
+def _extract_article_text(html: str, max_words: int = 3000) -> str:
+    """Visible article text without the page chrome (head, nav, footer, scripts, styles),
+    capped at max_words (~4k tokens) on a word boundary."""
+    # Generated pages keep all content inside <article>; narrowing to it first means
+    # the regexes below never scan the head, nav, footer or WhatsApp widget
+    start = html.find("<article")
+    end = html.rfind("</article>")
+    if start != -1 and end > start:
+        html = html[start:end]
+    text = _PAGE_CHROME_RE.sub(" ", html)
+    text = html_lib.unescape(_TAG_RE.sub(" ", text))
+    words = _WHITESPACE_RE.sub(" ", text).strip().split(" ")
+    return " ".join(words[:max_words])
+
+
+# Pass 4 output for the pre-fix draft is kept when the fixed article text is at
+# least this similar (difflib ratio over words)
+SOCIAL_REUSE_MIN_SIMILARITY = 0.9
+
+
+def _text_similarity(html_a: str, html_b: str) -> float:
+    """Similarity (0–1) of the article text Pass 4 would see for two versions of a draft."""
+    words_a = _extract_article_text(html_a).split(" ")
+    words_b = _extract_article_text(html_b).split(" ")
+    return difflib.SequenceMatcher(None, words_a, words_b, autojunk=False).ratio()
+
+
+def _social_request(fmt: str, user_message: str) -> dict:
+    """call_claude / call_claude_batch arguments for one Pass 4 format."""
+    return {
+        "system_prompt": SOCIAL_MEDIA_PROMPT + SOCIAL_FORMAT_PROMPTS[fmt],
+        "user_message": user_message,
+        "model": CLAUDE_FAST_MODEL,
+        "max_tokens": 2000,
+    }
+
+
+def _parse_social_format(fmt: str, raw: str) -> dict:
+    """Parse one Pass 4 format; returns {fmt: value} or an error entry."""
+    try:
+        return {fmt: _json_loads(_strip_fences(raw))[fmt]}
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return {"error": f"Could not parse {fmt} content", f"raw_{fmt}": raw[:2000]}
+
+
+def pass4_social(html: str, post: dict, cancel: threading.Event | None = None) -> dict | None:
+    """Generate social media derivative content from the approved blog post.
+    The four formats are independent, so they are requested in parallel — or, with
+    SOCIAL_USE_BATCH, as one Message Batch at half the price (the result can take
+    minutes to arrive, and the pipeline waits for it before finishing).
+    Setting cancel abandons the run and returns None: a pending batch is cancelled,
+    and format requests that haven't been sent yet are skipped. Requests already
+    in flight still complete (and are billed)."""
 
     user_message = f"""Generate social media derivatives for this blog post.
 
@@ -1132,24 +1853,32 @@ def pass4_social(html: str, post: dict) -> dict:
 - URL: {SITE_URL}/{post['slug']}.html
 - Keywords: {post['keywords']}
 
-## BLOG POST HTML
-{html[:8000]}
+## ARTICLE TEXT
+{_extract_article_text(html)}
 
-Generate LinkedIn post, Twitter thread, email newsletter snippet, and Instagram carousel text.
 Output as JSON only.
 """
 
-    print("  [Pass 4] Generating social media derivatives...")
-    raw = call_claude(SOCIAL_MEDIA_PROMPT, user_message)
-
-    raw = re.sub(r"^```json?\s*", "", raw, flags=re.MULTILINE)
-    raw = re.sub(r"```\s*$", "", raw, flags=re.MULTILINE)
-
-    try:
-        social = json.loads(raw.strip())
-    except json.JSONDecodeError:
-        social = {"error": "Could not parse social media content", "raw": raw[:2000]}
+    logger.info("[Pass 4] Generating social media derivatives%s...", " (batch)" if SOCIAL_USE_BATCH else "")
+    if SOCIAL_USE_BATCH:
+        raw = call_claude_batch([{"custom_id": fmt, **_social_request(fmt, user_message)}
+                                 for fmt in SOCIAL_FORMAT_PROMPTS], cancel=cancel)
+    else:
+        def request_format(fmt: str) -> str:
+            # Requests can queue behind _claude_slots; skip any not yet sent once cancelled
+            if cancel is not None and cancel.is_set():
+                return ""
+            return call_claude(**_social_request(fmt, user_message))
+
+        with ThreadPoolExecutor(max_workers=len(SOCIAL_FORMAT_PROMPTS)) as pool:
+            raw = dict(zip(SOCIAL_FORMAT_PROMPTS, pool.map(request_format, SOCIAL_FORMAT_PROMPTS)))
+    if cancel is not None and cancel.is_set():
+        logger.info("[Pass 4] Cancelled — superseded by a newer draft")
+        return None
 
+    social = {}
+    for fmt in SOCIAL_FORMAT_PROMPTS:
+        social.update(_parse_social_format(fmt, raw.get(fmt, "")))
     return social
 
 
@@ -1157,24 +1886,102 @@ Output as JSON only.
 # NEWS MONITOR — reactive content detection
 # ---------------------------------------------------------------------------
 
-def run_news_monitor():
-    """Daily scan of government sources for new developments."""
+# One query per source family — each becomes its own batch item with a small
+# web-search budget, instead of 7 overlapping queries sharing one budget
+NEWS_SEARCH_QUERIES = [
+    "IRS FinCEN SEC new guidance Puerto Rico territory digital asset reporting 2026",
+    "Hacienda circular DDEC decree Act 60 legislation Congress Puerto Rico tax incentive 2026",
+    "bitcoin tax IRS new ruling FASB bitcoin accounting standard update 2026",
+]
+
+SEEN_ALERT_DAYS = 30
+_URL_RE = re.compile(r"https?://[^\s)\"'<>]+")
+
+
+def _alert_fingerprint(alert: dict) -> str:
+    """Identify an alert by its source URL (falling back to the headline) so the same
+    development isn't re-reported on every run."""
+    url_match = _URL_RE.search(alert.get("source", ""))
+    key = url_match.group(0).rstrip(".,;") if url_match else alert.get("headline", "")
+    return hashlib.sha1(key.strip().lower().encode("utf-8")).hexdigest()
 
-    search_queries = [
-        "IRS new guidance Puerto Rico territory 2026",
-        "Hacienda Puerto Rico nueva circular 2026",
-        "DDEC Puerto Rico decree update 2026",
-        "bitcoin tax IRS new ruling 2026",
-        "FinCEN cryptocurrency reporting update 2026",
-        "Puerto Rico Act 60 legislation 2026",
-        "Congress Puerto Rico tax incentive bill 2026",
-    ]
 
-    user_message = f"""Search for recent regulatory developments using these queries:
+# Headlines sharing this fraction of their words (Jaccard) are treated as the same
+# development reworded, e.g. "IRS issues Notice 2026-12" / "IRS releases Notice 2026-12"
+ALERT_SIMILARITY_THRESHOLD = 0.6
+ALERT_SIMILARITY_WINDOW = 200  # most recent headlines compared against
+_HEADLINE_WORD_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_HEADLINE_STOPWORDS = frozenset({"the", "and", "for", "from", "with", "new", "on", "of", "to", "in", "a", "an"})
 
-{json.dumps(search_queries, indent=2)}
 
-For each query, search the web and evaluate the results. 
+def _headline_words(headline: str) -> frozenset:
+    return frozenset(w for w in _HEADLINE_WORD_RE.findall(headline.lower()) if w not in _HEADLINE_STOPWORDS)
+
+
+def _similar_headline(words: frozenset, recent: list[frozenset]) -> bool:
+    """True if words overlaps any recent headline by ALERT_SIMILARITY_THRESHOLD or more."""
+    for other in recent:
+        union = len(words | other)
+        if union and len(words & other) / union >= ALERT_SIMILARITY_THRESHOLD:
+            return True
+    return False
+
+
+def _filter_seen_alerts(alerts: list[dict]) -> list[dict]:
+    """Drop alerts already reported in the last SEEN_ALERT_DAYS days, either from the
+    same source or under a near-identical headline, and remember the new ones."""
+    try:
+        seen = read_json(SEEN_ALERTS_PATH)
+    except (FileNotFoundError, json.JSONDecodeError):
+        seen = {}
+    if "fingerprints" not in seen:
+        # Older files are a flat {fingerprint: ts} map
+        seen = {"fingerprints": seen, "headlines": {}}
+
+    cutoff = (datetime.now() - timedelta(days=SEEN_ALERT_DAYS)).isoformat()
+    fingerprints = {k: ts for k, ts in seen["fingerprints"].items() if ts >= cutoff}
+    headlines = {k: ts for k, ts in seen["headlines"].items() if ts >= cutoff}
+    recent = [_headline_words(h) for h, _ in
+              sorted(headlines.items(), key=lambda item: item[1], reverse=True)[:ALERT_SIMILARITY_WINDOW]]
+
+    fresh = []
+    now = datetime.now().isoformat()
+    for alert in alerts:
+        headline = alert.get("headline", "")
+        fingerprint = _alert_fingerprint(alert)
+        if fingerprint in fingerprints:
+            logger.info("⏭ Already reported: %s", headline or "Unknown")
+            continue
+        words = _headline_words(headline)
+        if words and _similar_headline(words, recent):
+            logger.info("⏭ Similar to a recent alert: %s", headline)
+            continue
+        fingerprints[fingerprint] = now
+        if words:
+            headlines[headline] = now
+            recent.insert(0, words)
+        fresh.append(alert)
+
+    write_json(SEEN_ALERTS_PATH, {"fingerprints": fingerprints, "headlines": headlines})
+    return fresh
+
+
+def run_news_monitor(use_batch: bool | None = None):
+    """Daily scan of government sources for new developments.
+    Each search query is its own request, researched in parallel: as items of one
+    Message Batch at batch pricing (NEWS_USE_BATCH, the default for scheduled runs),
+    or as concurrent real-time calls when someone is waiting on the result. The
+    alerts are then merged and anything already reported in a previous run is dropped."""
+    if use_batch is None:
+        use_batch = NEWS_USE_BATCH
+
+    requests = []
+    for i, query in enumerate(NEWS_SEARCH_QUERIES):
+        user_message = f"""Search for recent regulatory developments using this query:
+
+"{query}"
+
+Search the web and evaluate the results. 
 Report ONLY genuinely NEW developments from the past 7 days that would affect:
 - Act 60 decree holders in Puerto Rico
 - Bitcoin investors/holders in Puerto Rico  
@@ -1185,20 +1992,59 @@ Do NOT report routine news, opinion pieces, or old information.
 Only official government actions: new laws signed, new IRS guidance published, 
 new Hacienda circulars, new FinCEN rules, court decisions, etc.
 
-Output ONLY the JSON report.
+Submit your findings with the submit_report tool.
 """
-
-    print("[News Monitor] Scanning government sources...")
-    raw = call_claude(NEWS_MONITOR_PROMPT, user_message, use_web_search=True)
-
-    raw = re.sub(r"^```json?\s*", "", raw, flags=re.MULTILINE)
-    raw = re.sub(r"```\s*$", "", raw, flags=re.MULTILINE)
-
-    try:
-        report = json.loads(raw.strip())
-    except json.JSONDecodeError:
-        report = {"alerts": [], "no_alerts": True, "parse_error": True}
-
+        requests.append({
+            "custom_id": f"news-{i}",
+            "system_prompt": NEWS_MONITOR_PROMPT,
+            "user_message": user_message,
+            "use_web_search": True,
+            "web_search_max_uses": 4,
+            "model": CLAUDE_FAST_MODEL,
+            "max_tokens": 2000,
+            "output_tool": NEWS_REPORT_TOOL,
+        })
+
+    logger.info("[News Monitor] Scanning government sources (%s queries%s)...",
+                len(requests), ", batch" if use_batch else "")
+    # Regulatory news goes stale quickly — only reuse results from the same day
+    cache_ttl = timedelta(hours=12)
+    if use_batch:
+        results = call_claude_batch(requests, cache_ttl=cache_ttl)
+    else:
+        # _claude_slots caps how many of these are in flight at once
+        def scan(req):
+            try:
+                return call_claude(**{k: v for k, v in req.items() if k != "custom_id"},
+                                   cache_ttl=cache_ttl)
+            except Exception as e:
+                logger.warning("[News Monitor] %s failed: %s", req["custom_id"], e)
+                return ""
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+            results = dict(zip((req["custom_id"] for req in requests), pool.map(scan, requests)))
+
+    alerts = []
+    seen_headlines = set()
+    parse_errors = 0
+    for custom_id, raw in results.items():
+        report = _extract_json_object(raw)
+        if report is None:
+            parse_errors += 1
+            continue
+
+        # Several queries often surface the same development — keep the first copy
+        for alert in report.get("alerts", []):
+            key = alert.get("headline", "").strip().lower()
+            if key in seen_headlines:
+                continue
+            seen_headlines.add(key)
+            alerts.append(alert)
+
+    alerts = _filter_seen_alerts(alerts)
+    report = {"alerts": alerts, "no_alerts": not alerts}
+    if parse_errors:
+        report["parse_error"] = True
     return report
 
 
@@ -1206,50 +2052,24 @@ Output ONLY the JSON report.
 # WHATSAPP NOTIFICATION FORMATTING
 # ---------------------------------------------------------------------------
 
-def format_draft_notification(post: dict, audit: dict, draft_path: str) -> tuple[str, str, str]:
-    """Format an email notification for a new draft. Returns (subject, plain_text, html)."""
-
-    grade = audit.get("overall_grade", "?")
-    critical = len(audit.get("critical_issues", []))
-    warnings = len(audit.get("warnings", []))
-    suggestions = len(audit.get("suggestions", []))
-
-    status = "✅ PASSED" if audit.get("publish_ready") else "⚠️ NEEDS REVIEW"
-    review_url = f"{DASHBOARD_URL}/review/{post['slug']}"
-    social_url = f"{DASHBOARD_URL}/social/{post['slug']}"
-
-    subject = f"{'✅' if audit.get('publish_ready') else '⚠️'} Blog Draft: {post['title_en'][:60]}"
-
-    plain_text = f"""{status} — Blog Draft Ready for Review
+_DRAFT_EMAIL_WARNING = '<p style="color: #92400E; background: #FFFBEB; padding: 8px 12px; border-radius: 6px; font-size: 13px; margin: 4px 0;">⚠️ {issue}</p>'
 
-Title: {post['title_en']}
-Cluster: {post['cluster']}
-Audit Grade: {grade}
-Critical: {critical} | Warnings: {warnings} | Suggestions: {suggestions}
-
-Review & Edit: {review_url}
-Social Content: {social_url}
-"""
-
-    for w in audit.get("warnings", [])[:5]:
-        plain_text += f"\n⚠️ {w.get('issue', w.get('recommendation', ''))[:120]}"
-
-    html = f"""
+_DRAFT_EMAIL_TEMPLATE = """
     <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
       <div style="background: #0F172A; padding: 20px 24px; border-radius: 12px 12px 0 0;">
         <span style="color: #CC0000; font-weight: 900; font-size: 18px;">PuertoRico</span><span style="color: #3A99D8; font-weight: 900; font-size: 18px;">LLC</span>
         <span style="color: #64748B; font-size: 14px; margin-left: 8px;">Blog Engine</span>
       </div>
       <div style="background: #ffffff; border: 1px solid #E2E8F0; padding: 24px; border-radius: 0 0 12px 12px;">
-        <div style="background: {'#F0FDF4' if audit.get('publish_ready') else '#FFFBEB'}; border-left: 4px solid {'#16A34A' if audit.get('publish_ready') else '#EAB308'}; padding: 12px 16px; border-radius: 0 8px 8px 0; margin-bottom: 20px;">
+        <div style="background: {status_bg}; border-left: 4px solid {status_border}; padding: 12px 16px; border-radius: 0 8px 8px 0; margin-bottom: 20px;">
           <strong style="font-size: 16px;">{status}</strong>
           <span style="color: #64748B; font-size: 14px; margin-left: 8px;">Audit Grade: {grade}</span>
         </div>
 
-        <h2 style="color: #0F172A; font-size: 20px; margin: 0 0 8px 0;">{post['title_en']}</h2>
-        <p style="color: #64748B; font-size: 14px; margin: 0 0 20px 0;">Cluster: {post['cluster']} &nbsp;|&nbsp; 🔴 {critical} critical &nbsp;|&nbsp; 🟡 {warnings} warnings &nbsp;|&nbsp; 🟢 {suggestions} suggestions</p>
+        <h2 style="color: #0F172A; font-size: 20px; margin: 0 0 8px 0;">{title}</h2>
+        <p style="color: #64748B; font-size: 14px; margin: 0 0 20px 0;">Cluster: {cluster} &nbsp;|&nbsp; 🔴 {critical} critical &nbsp;|&nbsp; 🟡 {warnings} warnings &nbsp;|&nbsp; 🟢 {suggestions} suggestions</p>
 
-        {''.join(f'<p style="color: #92400E; background: #FFFBEB; padding: 8px 12px; border-radius: 6px; font-size: 13px; margin: 4px 0;">⚠️ {w.get("issue", w.get("recommendation", ""))[:150]}</p>' for w in audit.get("warnings", [])[:5])}
+        {warnings_html}
 
         <div style="margin-top: 24px; text-align: center;">
           <a href="{review_url}" style="display: inline-block; background: #1E3A8A; color: white; padding: 14px 32px; border-radius: 8px; text-decoration: none; font-weight: bold; font-size: 16px; margin-right: 8px;">✏️ Review & Edit</a>
@@ -1261,28 +2081,66 @@ Social Content: {social_url}
     </div>
     """
 
-    return subject, plain_text, html
 
+def format_draft_notification(post: dict, audit: dict, draft_path: str) -> tuple[str, str, str]:
+    """Format an email notification for a new draft. Returns (subject, plain_text, html)."""
 
-def format_news_alert(alert: dict) -> tuple[str, str, str]:
-    """Format an email notification for a news alert. Returns (subject, plain_text, html)."""
+    grade = audit.get("overall_grade", "?")
+    critical = len(audit.get("critical_issues", []))
+    warnings = len(audit.get("warnings", []))
+    suggestions = len(audit.get("suggestions", []))
 
-    subject = f"🔴 New Content Opportunity: {alert.get('headline', 'Regulatory Update')[:50]}"
+    status = "✅ PASSED" if audit.get("publish_ready") else "⚠️ NEEDS REVIEW"
+    review_url = f"{DASHBOARD_URL}/review/{post['slug']}"
+    social_url = f"{DASHBOARD_URL}/social/{post['slug']}"
+
+    subject = f"{'✅' if audit.get('publish_ready') else '⚠️'} Blog Draft: {post['title_en'][:60]}"
+
+    top_warnings = [w.get("issue", w.get("recommendation", "")) for w in audit.get("warnings", [])[:5]]
+
+    plain_text = f"""{status} — Blog Draft Ready for Review
+
+Title: {post['title_en']}
+Cluster: {post['cluster']}
+Audit Grade: {grade}
+Critical: {critical} | Warnings: {warnings} | Suggestions: {suggestions}
 
-    plain_text = f"""BREAKING: Content Opportunity Detected
+Review & Edit: {review_url}
+Social Content: {social_url}
+""" + "".join(f"\n⚠️ {issue[:120]}" for issue in top_warnings)
+
+    html = _DRAFT_EMAIL_TEMPLATE.format(
+        status_bg="#F0FDF4" if audit.get("publish_ready") else "#FFFBEB",
+        status_border="#16A34A" if audit.get("publish_ready") else "#EAB308",
+        status=status,
+        grade=grade,
+        title=post["title_en"],
+        cluster=post["cluster"],
+        critical=critical,
+        warnings=warnings,
+        suggestions=suggestions,
+        warnings_html="".join(_DRAFT_EMAIL_WARNING.format(issue=issue[:150]) for issue in top_warnings),
+        review_url=review_url,
+        social_url=social_url,
+    )
+
+    return subject, plain_text, html
 
-Headline: {alert['headline']}
-Source: {alert['source']}
-Relevance: {alert['relevance']}
-Urgency: {alert['urgency']}
 
-Suggested post: "{alert['suggested_title']}"
-Cluster: {alert['cluster']}
+_NEWS_ALERT_TEXT_TEMPLATE = """BREAKING: Content Opportunity Detected
 
-To generate a draft, trigger manually in Railway or reply to this email.
+Headline: {headline}
+Source: {source}
+Relevance: {relevance}
+Urgency: {urgency}
+
+Suggested post: "{suggested_title}"
+Cluster: {cluster}
+
+{action}
 """
 
-    html = f"""
+_NEWS_ALERT_EMAIL_TEMPLATE = """
     <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
       <div style="background: #0F172A; padding: 20px 24px; border-radius: 12px 12px 0 0;">
         <span style="color: #CC0000; font-weight: 900; font-size: 18px;">PuertoRico</span><span style="color: #3A99D8; font-weight: 900; font-size: 18px;">LLC</span>
@@ -1290,72 +2148,140 @@ To generate a draft, trigger manually in Railway or reply to this email.
       </div>
       <div style="background: #ffffff; border: 1px solid #E2E8F0; padding: 24px; border-radius: 0 0 12px 12px;">
         <div style="background: #FEF2F2; border-left: 4px solid #EF4444; padding: 12px 16px; border-radius: 0 8px 8px 0; margin-bottom: 20px;">
-          <strong style="font-size: 14px; color: #991B1B;">🔴 Urgency: {alert['urgency']}</strong>
+          <strong style="font-size: 14px; color: #991B1B;">🔴 Urgency: {urgency}</strong>
         </div>
-        <h2 style="color: #0F172A; font-size: 20px; margin: 0 0 12px 0;">{alert['headline']}</h2>
-        <p style="color: #475569; font-size: 14px;"><strong>Source:</strong> {alert['source']}</p>
-        <p style="color: #475569; font-size: 14px;"><strong>Why it matters:</strong> {alert['relevance']}</p>
+        <h2 style="color: #0F172A; font-size: 20px; margin: 0 0 12px 0;">{headline}</h2>
+        <p style="color: #475569; font-size: 14px;"><strong>Source:</strong> {source}</p>
+        <p style="color: #475569; font-size: 14px;"><strong>Why it matters:</strong> {relevance}</p>
         <div style="background: #F8FAFC; padding: 16px; border-radius: 8px; margin: 16px 0;">
           <p style="color: #64748B; font-size: 13px; margin: 0 0 4px 0;">Suggested blog post:</p>
-          <p style="color: #0F172A; font-weight: bold; margin: 0;">"{alert['suggested_title']}"</p>
-        </div>
-        <p style="color: #94A3B8; font-size: 12px; text-align: center; margin-top: 24px;">To generate this post, trigger a manual run in Railway dashboard.</p>
+          <p style="color: #0F172A; font-weight: bold; margin: 0;">&ldquo;{suggested_title}&rdquo;</p>{details_html}
+        </div>{footer_html}
       </div>
     </div>
     """
 
+_NEWS_ALERT_CATEGORY_HTML = """
+          <p style="color: #64748B; font-size: 12px; margin: 8px 0 0 0;">Category: {cluster}</p>"""
+
+_NEWS_ALERT_MANUAL_FOOTER = """
+        <p style="color: #94A3B8; font-size: 12px; text-align: center; margin-top: 24px;">To generate this post, trigger a manual run in Railway dashboard.</p>"""
+
+_NEWS_ALERT_BUTTON_FOOTER = """
+        <div style="text-align: center; margin: 24px 0 16px 0;">
+          <a href="{generate_url}" style="display: inline-block; background: #16A34A; color: #ffffff; padding: 14px 32px; border-radius: 8px; text-decoration: none; font-weight: bold; font-size: 16px;">✅ Approve &amp; Generate Article</a>
+        </div>
+        <p style="color: #94A3B8; font-size: 11px; text-align: center;">Clicking will start article generation (~8 min). You'll review it before publishing.</p>"""
+
+
+def _news_alert_email(alert: dict, action: str, details_html: str, footer_html: str) -> tuple[str, str, str]:
+    """Render the shared news alert email. Returns (subject, plain_text, html)."""
+    subject = f"🔴 New Content Opportunity: {alert.get('headline', 'Regulatory Update')[:50]}"
+    # The JSON fallback (no submit_report tool) isn't schema-checked, so any field may be missing
+    fields = {
+        "headline": alert.get("headline", "Regulatory Update"),
+        "source": alert.get("source", "Unknown"),
+        "relevance": alert.get("relevance", "N/A"),
+        "urgency": alert.get("urgency", "Unknown"),
+        "suggested_title": alert.get("suggested_title", "N/A"),
+    }
+    plain_text = _NEWS_ALERT_TEXT_TEMPLATE.format(
+        **fields, cluster=alert.get("cluster", "N/A"), action=action)
+    html = _NEWS_ALERT_EMAIL_TEMPLATE.format(
+        **{k: html_lib.escape(str(v)) for k, v in fields.items()},
+        details_html=details_html,
+        footer_html=footer_html,
+    )
     return subject, plain_text, html
 
 
+def format_news_alert(alert: dict) -> tuple[str, str, str]:
+    """Format an email notification for a news alert. Returns (subject, plain_text, html)."""
+    return _news_alert_email(
+        alert,
+        action="To generate a draft, trigger manually in Railway or reply to this email.",
+        details_html="",
+        footer_html=_NEWS_ALERT_MANUAL_FOOTER,
+    )
+
+
 # ---------------------------------------------------------------------------
 # BLOG.HTML & SITEMAP UPDATER
 # ---------------------------------------------------------------------------
 
-def generate_blog_card_html(post: dict, calendar: dict) -> str:
-    """Generate the HTML card snippet for blog.html."""
-    cluster = calendar["clusters"][post["cluster"]]
-    date_str = datetime.now().strftime("%B %d, %Y")
-    date_str_es = datetime.now().strftime("%d %B %Y")
+_MONTHS_ES = ("enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+              "agosto", "septiembre", "octubre", "noviembre", "diciembre")
 
-    return f"""
-                <!-- {post['slug']} -->
+
+def format_post_dates(day: datetime) -> tuple[str, str]:
+    """Return (date_en, date_es) display strings, e.g. ("March 05, 2026", "5 de marzo de 2026").
+    The Spanish month names come from a table so the output doesn't depend on the system locale."""
+    return day.strftime("%B %d, %Y"), f"{day.day} de {_MONTHS_ES[day.month - 1]} de {day.year}"
+
+
+_CARD_TEMPLATE = string.Template("""
+                <!-- $slug -->
                 <article class="blog-card bg-white rounded-2xl shadow-lg overflow-hidden border border-slate-100"
-                         data-category="{cluster['category_tag']}">
+                         data-category="$category_tag">
                     <div class="p-8">
                         <div class="flex items-center gap-3 mb-4">
-                            <span class="bg-{cluster['color']}-100 text-{cluster['color']}-800 px-3 py-1 rounded-full text-xs font-bold">
-                                <span data-lang="en">{cluster['category_label_en']}</span>
-                                <span data-lang="es">{cluster['category_label_es']}</span>
+                            <span class="bg-$color-100 text-$color-800 px-3 py-1 rounded-full text-xs font-bold">
+                                <span data-lang="en">$category_label_en</span>
+                                <span data-lang="es">$category_label_es</span>
                             </span>
                             <span class="text-slate-400 text-xs">
-                                <span data-lang="en">{date_str}</span>
-                                <span data-lang="es">{date_str_es}</span>
+                                <span data-lang="en">$date_en</span>
+                                <span data-lang="es">$date_es</span>
                             </span>
                         </div>
                         <h3 class="text-xl font-black text-slate-900 mb-3 hover:text-blue-600 transition">
-                            <a href="{post['slug']}.html">
-                                <span data-lang="en">{post['title_en']}</span>
-                                <span data-lang="es">{post['title_es']}</span>
+                            <a href="$slug.html">
+                                <span data-lang="en">$title_en</span>
+                                <span data-lang="es">$title_es</span>
                             </a>
                         </h3>
-                        <a href="{post['slug']}.html" class="inline-flex items-center gap-2 text-blue-600 font-bold text-sm hover:text-blue-700 transition">
+                        <a href="$slug.html" class="inline-flex items-center gap-2 text-blue-600 font-bold text-sm hover:text-blue-700 transition">
                             <span data-lang="en">Read Full Article</span>
                             <span data-lang="es">Leer Artículo Completo</span>
                             <i class="fas fa-arrow-right text-xs"></i>
                         </a>
                     </div>
-                </article>"""
-
+                </article>""")
 
-def generate_sitemap_entry(post: dict) -> str:
-    """Generate a sitemap.xml entry for the new post."""
-    date = datetime.now().strftime("%Y-%m-%d")
-    return f"""  <url>
-    <loc>{SITE_URL}/{post['slug']}.html</loc>
-    <lastmod>{date}</lastmod>
+_SITEMAP_ENTRY_TEMPLATE = string.Template("""  <url>
+    <loc>$site_url/$slug.html</loc>
+    <lastmod>$date</lastmod>
     <changefreq>monthly</changefreq>
     <priority>0.8</priority>
-  </url>"""
+  </url>""")
+
+
+def generate_blog_card_html(post: dict, calendar: dict, date_str: str, date_str_es: str) -> str:
+    """Generate the HTML card snippet for blog.html. Dates come from format_post_dates.
+    Titles and labels are HTML-escaped, so a title like "S&P / <LLC>" can't break the page."""
+    cluster = calendar["clusters"][post["cluster"]]
+    escape = html_lib.escape
+    return _CARD_TEMPLATE.substitute(
+        slug=escape(post["slug"]),
+        category_tag=escape(cluster["category_tag"]),
+        color=escape(cluster["color"]),
+        category_label_en=escape(cluster["category_label_en"]),
+        category_label_es=escape(cluster["category_label_es"]),
+        date_en=date_str,
+        date_es=date_str_es,
+        title_en=escape(post["title_en"]),
+        title_es=escape(post["title_es"]),
+    )
+
+
+def generate_sitemap_entry(post: dict, today: str | None = None) -> str:
+    """Generate a sitemap.xml entry for the new post. today is the YYYY-MM-DD lastmod
+    date; it defaults to the current date."""
+    return _SITEMAP_ENTRY_TEMPLATE.substitute(
+        site_url=SITE_URL,
+        slug=html_lib.escape(post["slug"]),
+        date=today or datetime.now().strftime("%Y-%m-%d"),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -1369,7 +2295,7 @@ def run_scheduled_pipeline():
     post = get_next_ungenerated_post(calendar)
 
     if not post:
-        print("All posts in the calendar have been generated.")
+        logger.info("All posts in the calendar have been generated.")
         return
 
     _run_pipeline(post, calendar)
@@ -1382,7 +2308,7 @@ def run_manual_pipeline():
     post = get_next_ungenerated_post(calendar)
 
     if not post:
-        print("All posts in the calendar have been generated.")
+        logger.info("All posts in the calendar have been generated.")
         return
 
     _run_pipeline(post, calendar)
@@ -1391,10 +2317,9 @@ def run_manual_pipeline():
 def run_custom_pipeline(title: str, keywords: str, cluster: str = "4_tax_strategy", cta: str = "consultation"):
     """Run the pipeline for a custom topic (not from the calendar).
     Used by the 'Generate Custom Article' form on the dashboard."""
-    import re
 
     # Build a slug from the title
-    slug = "blog-" + re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')[:80]
+    slug = "blog-" + _SLUG_SEPARATOR_RE.sub("-", title.lower()).strip('-')[:80]
 
     # Build a post dict matching calendar format
     post = {
@@ -1415,16 +2340,93 @@ def run_custom_pipeline(title: str, keywords: str, cluster: str = "4_tax_strateg
 
     calendar = load_calendar()
 
-    print(f"\n{'='*60}")
-    print(f"CUSTOM ARTICLE: {title}")
-    print(f"Keywords: {keywords}")
-    print(f"Cluster: {cluster} | CTA: {cta}")
-    print(f"Slug: {slug}")
-    print(f"{'='*60}\n")
+    logger.info("=" * 60)
+    logger.info("CUSTOM ARTICLE: %s", title)
+    logger.info("Keywords: %s", keywords)
+    logger.info("Cluster: %s | CTA: %s", cluster, cta)
+    logger.info("Slug: %s", slug)
+    logger.info("=" * 60)
 
     _run_pipeline(post, calendar)
 
 
+def _html_hash(html: str) -> str:
+    return _content_hash(html.encode("utf-8"))
+
+
+def _load_checks(slug: str, html_hash: str) -> dict:
+    """Return the saved Pass 2/Pass 4 results for a draft if they were produced
+    from exactly this HTML, otherwise {}."""
+    checks_path = DRAFTS_DIR / f"{slug}_checks.json"
+    try:
+        checks = read_json(checks_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return checks if checks.get("html_hash") == html_hash else {}
+
+
+def _save_checks(slug: str, html_hash: str, checks: dict):
+    """Record Pass 2/Pass 4 results against the HTML they were produced from."""
+    checks = {**checks, "html_hash": html_hash, "ts": datetime.now().isoformat()}
+    checks_path = DRAFTS_DIR / f"{slug}_checks.json"
+    write_json(checks_path, checks)
+
+
+AUDIT_CACHE_PATH = DRAFTS_DIR / ".audit_cache.json"
+_audit_cache_lock = threading.Lock()
+
+
+def _article_body_hash(html: str) -> str:
+    """Hash of the <article> element only, so the same article under a different
+    <head> (tracking snippet, meta tags) or slug maps to the same key."""
+    start = html.find("<article")
+    end = html.rfind("</article>")
+    if start != -1 and end > start:
+        html = html[start:end]
+    return _html_hash(html)
+
+
+def _cached_audit(body_hash: str) -> dict | None:
+    """Return a passing (A/B) audit of this article body from the last AUDIT_CACHE_DAYS."""
+    try:
+        entry = read_json(AUDIT_CACHE_PATH).get(body_hash)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not entry or entry["audit"].get("overall_grade", "")[:1] not in ("A", "B"):
+        return None
+    if datetime.now() - datetime.fromisoformat(entry["ts"]) > timedelta(days=AUDIT_CACHE_DAYS):
+        return None
+    return entry["audit"]
+
+
+def _remember_audit(body_hash: str, audit: dict):
+    """Store an audit in the body-hash cache, dropping entries past AUDIT_CACHE_DAYS."""
+    cutoff = (datetime.now() - timedelta(days=AUDIT_CACHE_DAYS)).isoformat()
+    with _audit_cache_lock:
+        try:
+            cache = read_json(AUDIT_CACHE_PATH)
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache = {}
+        cache = {k: v for k, v in cache.items() if v["ts"] >= cutoff}
+        cache[body_hash] = {"audit": audit, "ts": datetime.now().isoformat()}
+        write_json(AUDIT_CACHE_PATH, cache)
+
+
+def _write_artifacts(slug: str, artifacts: dict[str, str | bytes]):
+    """Write a group of draft artifacts ({suffix: content}) for one post in a single pass.
+    Everything is rendered before the first write, so a rendering error can't leave
+    the group half-written. The files are written concurrently (file I/O releases
+    the GIL), each one atomically."""
+    paths = [DRAFTS_DIR / f"{slug}{suffix}" for suffix in artifacts]
+    if len(paths) == 1:
+        atomic_write(paths[0], next(iter(artifacts.values())))
+    else:
+        with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+            # list() re-raises the first write error, if any
+            list(pool.map(atomic_write, paths, artifacts.values()))
+    logger.info("✓ Saved %s", ", ".join(f"{slug}{suffix}" for suffix in artifacts))
+
+
 def _run_pipeline(post: dict, calendar: dict):
     """Core pipeline logic shared by scheduled and manual triggers.
     
@@ -1432,146 +2434,222 @@ def _run_pipeline(post: dict, calendar: dict):
     1. Check if a pre-generated HTML exists in PRE_GENERATED_DIR
     2. If YES: skip Pass 1 (save API credits), use the pre-written article
     3. If NO: fall back to full Pass 1 API generation (for custom/alert articles)
-    4. Always run Pass 2 (audit) — 1 API call for quality assurance
+    4. Run Pass 2 (audit) — 1 API call, skipped if this exact HTML was already audited.
+       The blog card and sitemap entry are written while the audit runs
     5. If audit finds critical issues AND article was API-generated: run Pass 3 fix
     6. If audit finds critical issues AND article was pre-generated: flag for manual review
-    7. Run Pass 4 (social media) 
+    7. Run Pass 4 (social media) if ENABLE_SOCIAL_PASS is set, started alongside step 4
+       and overlapped with the audit, the fix and step 8
     8. Send email notification
     """
-    import time
 
-    print(f"\n{'='*60}")
-    print(f"GENERATING: {post['title_en']}")
-    print(f"Cluster: {post['cluster']}")
-    print(f"Slug: {post['slug']}")
-    print(f"{'='*60}\n")
+    logger.info("=" * 60)
+    logger.info("GENERATING: %s", post["title_en"])
+    logger.info("Cluster: %s", post["cluster"])
+    logger.info("Slug: %s", post["slug"])
+    logger.info("=" * 60)
+
+    # One timestamp for the whole run, so the article, card and sitemap agree on
+    # the publish date even if the run crosses midnight
+    now = datetime.now()
+    date_en, date_es = format_post_dates(now)
 
     # Check for pre-generated article first
     pre_gen_path = PRE_GENERATED_DIR / f"{post['slug']}.html"
     is_pre_generated = pre_gen_path.exists()
 
     if is_pre_generated:
-        print(f"  📄 Found pre-generated article: {pre_gen_path}")
+        logger.info("📄 Found pre-generated article: %s", pre_gen_path)
         html = pre_gen_path.read_text(encoding="utf-8")
-        print(f"  ✓ Loaded pre-generated HTML ({len(html):,} chars)")
-        print(f"  💰 Pass 1 SKIPPED — saving API credits")
+        logger.info("✓ Loaded pre-generated HTML (%d chars)", len(html))
+        logger.info("💰 Pass 1 SKIPPED — saving API credits")
     else:
-        print(f"  ⚡ No pre-generated file found — generating via API...")
+        logger.info("⚡ No pre-generated file found — generating via API...")
         # Pass 1: Generate (full API call with web search)
-        html = pass1_generate(post, calendar)
-        print(f"  ✓ API-generated HTML ({len(html):,} chars)")
-
-        # Wait for rate limit
-        print("  ⏳ Waiting 90s for rate limit reset...")
-        time.sleep(90)
+        html = pass1_generate(post, calendar, now)
+        logger.info("✓ API-generated HTML (%d chars)", len(html))
 
     # Save initial draft
     draft_path = DRAFTS_DIR / f"{post['slug']}.html"
-    draft_path.write_text(html, encoding="utf-8")
-    print(f"  ✓ Draft saved: {draft_path}")
-
-    # Pass 2: Audit (always runs — 1 API call for quality assurance)
-    if not is_pre_generated:
-        # Only need to wait if we just did Pass 1
-        pass
-    else:
-        # Pre-generated articles go straight to audit, no wait needed
-        pass
-
-    audit = pass2_audit(html, post)
-    audit_path = DRAFTS_DIR / f"{post['slug']}_audit.json"
-    audit_path.write_text(json.dumps(audit, indent=2), encoding="utf-8")
-    print(f"  ✓ Audit saved: {audit_path}")
-    print(f"  Grade: {audit.get('overall_grade', '?')} | "
-          f"Critical: {len(audit.get('critical_issues', []))} | "
-          f"Warnings: {len(audit.get('warnings', []))}")
-
-    # Pass 3: Fix critical issues
-    if audit.get("critical_issues"):
-        if is_pre_generated:
-            # Pre-generated articles: flag issues but DON'T auto-fix
-            # (you wrote it in Claude Chat, so review the audit manually)
-            print(f"  ⚠ {len(audit['critical_issues'])} critical issues found in pre-generated article")
-            print(f"  📋 Issues flagged for your manual review (not auto-fixing pre-generated content)")
+    atomic_write(draft_path, html)
+    logger.info("✓ Draft saved: %s", draft_path)
+    flush_log()
+
+    # Pass 2 (audit) and Pass 4 (social) both read only the draft, so they run side
+    # by side on worker threads. Pass 2 is skipped when this exact HTML was already
+    # audited (e.g. a rerun after a no-op edit).
+    html_hash = _html_hash(html)
+    checks = _load_checks(post["slug"], html_hash)
+    body_hash = _article_body_hash(html)
+    # One executor each for the audit, Pass 4 and file writes. Pass 4 gets its own so a
+    # rerun after Pass 3 starts at once instead of waiting for a worker held by the
+    # superseded speculative run; the writer's single worker keeps draft/audit writes in
+    # order and never queues them behind (possibly hours-long) LLM futures
+    with ThreadPoolExecutor(max_workers=1) as pool, \
+            ThreadPoolExecutor(max_workers=2) as social_pool, \
+            ThreadPoolExecutor(max_workers=1) as writer:
+        audit_future = None
+        if checks.get("audit"):
+            logger.info("✓ Pass 2 skipped — draft unchanged since last audit")
+        elif cached_audit := _cached_audit(body_hash):
+            logger.info("✓ Pass 2 skipped — identical article body graded %s within %s days",
+                        cached_audit.get("overall_grade", "?"), AUDIT_CACHE_DAYS)
+            checks = {**checks, "audit": cached_audit}
+            _save_checks(post["slug"], html_hash, checks)
         else:
-            # API-generated articles: auto-fix as before
-            print(f"  ⚠ {len(audit['critical_issues'])} critical issues found — auto-fixing...")
-            print("  ⏳ Waiting 90s for rate limit reset...")
-            time.sleep(90)
-
-            html = pass3_fix(html, audit, post)
-            draft_path.write_text(html, encoding="utf-8")
-
-            # Re-audit the fixed version
-            print("  ⏳ Waiting 90s for rate limit reset...")
-            time.sleep(90)
-
-            audit2 = pass2_audit(html, post)
-            audit_path.write_text(json.dumps(audit2, indent=2), encoding="utf-8")
-            print(f"  ✓ Post-fix audit: Grade {audit2.get('overall_grade', '?')} | "
-                  f"Critical: {len(audit2.get('critical_issues', []))}")
-            audit = audit2
-
-    # Pass 4: Social media — SKIPPED
-    # Social content can be generated manually in Claude Chat from the published article.
-    # This saves 1 API call per article.
-    print(f"  ⏭ Pass 4 (social) skipped — generate manually in Claude Chat after publishing")
-
-    # Generate blog card and sitemap entry
-    card_html = generate_blog_card_html(post, calendar)
-    card_path = DRAFTS_DIR / f"{post['slug']}_card.html"
-    card_path.write_text(card_html, encoding="utf-8")
-
-    sitemap_entry = generate_sitemap_entry(post)
-    sitemap_path = DRAFTS_DIR / f"{post['slug']}_sitemap.xml"
-    sitemap_path.write_text(sitemap_entry, encoding="utf-8")
-
-    # Send email notification
-    source_label = "PRE-GENERATED" if is_pre_generated else "API-GENERATED"
-    try:
-        subject, plain, html_email = format_draft_notification(post, audit, str(draft_path))
-        # Prepend source label to subject
-        subject = f"[{source_label}] {subject}"
-        send_email(subject, plain, html_email)
-        print(f"  ✓ Email notification sent to {NOTIFY_EMAIL}")
-    except Exception as e:
-        print(f"  ✗ Email error: {e}")
-        subject, plain, _ = format_draft_notification(post, audit, str(draft_path))
-        print(f"  Subject: [{source_label}] {subject}")
-        print(f"  {plain[:300]}")
+            audit_future = pool.submit(pass2_audit, html, post)
+
+        # Pass 4: Social media — opt-in via ENABLE_SOCIAL_PASS=1.
+        # Otherwise social content can be generated manually in Claude Chat from the
+        # published article, which saves 1 API call per article.
+        # It starts speculatively on the unaudited draft and overlaps the audit, Pass 3
+        # and the notification email. If Pass 3 rewrites the article materially the
+        # speculative run is told to stop (see pass4_social) and Pass 4 reruns on the fix.
+        social_future = None
+        social_cancel = threading.Event()
+        if ENABLE_SOCIAL_PASS and checks.get("social"):
+            logger.info("✓ Pass 4 skipped — reusing social content for unchanged draft")
+            social_future = social_pool.submit(lambda social=checks["social"]: social)
+        elif ENABLE_SOCIAL_PASS:
+            social_future = social_pool.submit(pass4_social, html, post, social_cancel)
+        else:
+            logger.info("⏭ Pass 4 (social) skipped — generate manually in Claude Chat after publishing")
+
+        # The card and sitemap don't depend on the audit — write them while it runs
+        _write_artifacts(post["slug"], {
+            "_card.html": generate_blog_card_html(post, calendar, date_en, date_es),
+            "_sitemap.xml": generate_sitemap_entry(post, today=now.strftime("%Y-%m-%d")),
+        })
+
+        # Later writes nothing reads back go to the writer, so the disk I/O overlaps
+        # the rate-budget wait and the next API call; they're joined before the email
+        pending_writes = []
+
+        if audit_future:
+            audit = audit_future.result()
+            checks = {**checks, "audit": audit}
+            _save_checks(post["slug"], html_hash, checks)
+            _remember_audit(body_hash, audit)
+        else:
+            audit = checks["audit"]
+        logger.info("Grade: %s | Critical: %s | Warnings: %s",
+                    audit.get("overall_grade", "?"), len(audit.get("critical_issues", [])),
+                    len(audit.get("warnings", [])))
+        flush_log()
+
+        # Pass 3: Fix critical issues
+        if audit.get("critical_issues"):
+            if is_pre_generated:
+                # Pre-generated articles: flag issues but DON'T auto-fix
+                # (you wrote it in Claude Chat, so review the audit manually)
+                logger.warning("⚠ %s critical issues found in pre-generated article",
+                               len(audit["critical_issues"]))
+                logger.info("📋 Issues flagged for your manual review (not auto-fixing pre-generated content)")
+            else:
+                # API-generated articles: patch missing template blocks locally, then
+                # auto-fix whatever is left with Pass 3
+                html, remaining, fixed = _try_local_fix(html, audit["critical_issues"])
+                if fixed:
+                    logger.info("✓ %s critical issue(s) fixed locally (missing template blocks)", len(fixed))
+                    atomic_write(draft_path, html)
+                    # Not re-audited: the patches only insert fixed template blocks, so the
+                    # fixed issues just move to fixed_locally. overall_grade and publish_ready
+                    # stay the auditor's verdict — they also reflect warnings and the rest
+                    # of the article, which a template patch says nothing about
+                    audit = {**audit, "critical_issues": remaining, "fixed_locally": fixed}
+                    html_hash = _html_hash(html)
+                    checks = {"audit": audit}
+                    _save_checks(post["slug"], html_hash, checks)
+
+            if not is_pre_generated and audit["critical_issues"]:
+                logger.warning("⚠ %s critical issues found — auto-fixing...", len(audit["critical_issues"]))
+
+                pre_fix_html = html
+                html = pass3_fix(html, audit, post)
+                pending_writes.append(writer.submit(atomic_write, draft_path, html))
+
+                if social_future and _text_similarity(pre_fix_html, html) < SOCIAL_REUSE_MIN_SIMILARITY:
+                    logger.info("Pass 3 changed the article materially — rerunning Pass 4 on the fixed draft")
+                    social_cancel.set()
+                    social_future = social_pool.submit(pass4_social, html, post)
+
+                # Re-audit the fixed version
+                audit2 = pass2_audit(html, post)
+                html_hash = _html_hash(html)
+                checks = {"audit": audit2}
+                _save_checks(post["slug"], html_hash, checks)
+                _remember_audit(_article_body_hash(html), audit2)
+                logger.info("✓ Post-fix audit: Grade %s | Critical: %s",
+                            audit2.get("overall_grade", "?"), len(audit2.get("critical_issues", [])))
+                audit = audit2
+
+        # Written once, after any fix, so the dashboard shows the audit of the final draft
+        audit_path = DRAFTS_DIR / f"{post['slug']}_audit.json"
+        pending_writes.append(writer.submit(write_json, audit_path, audit))
+        for write in pending_writes:
+            write.result()  # re-raise any write error before the draft is announced
+        logger.info("✓ Audit saved: %s", audit_path)
+
+        # Send email notification
+        source_label = "PRE-GENERATED" if is_pre_generated else "API-GENERATED"
+        try:
+            subject, plain, html_email = format_draft_notification(post, audit, str(draft_path))
+            # Prepend source label to subject
+            subject = f"[{source_label}] {subject}"
+            send_email_async(subject, plain, html_email)
+            logger.info("Email notification to %s queued", NOTIFY_EMAIL)
+        except Exception as e:
+            logger.error("✗ Email error: %s", e)
+            subject, plain, _ = format_draft_notification(post, audit, str(draft_path))
+            logger.info("Subject: [%s] %s", source_label, subject)
+            logger.info("%s", plain[:300])
 
-    print(f"\n{'='*60}")
+        if social_future:
+            try:
+                social = social_future.result()
+                if social and not checks.get("social"):
+                    checks["social"] = social
+                    _save_checks(post["slug"], html_hash, checks)
+                social_path = DRAFTS_DIR / f"{post['slug']}_social.json"
+                write_json(social_path, social)
+                logger.info("✓ Social content saved: %s", social_path)
+            except Exception as e:
+                logger.error("✗ Pass 4 (social) error: %s", e)
+
+    logger.info("=" * 60)
     if is_pre_generated:
-        print(f"PIPELINE COMPLETE (pre-generated) — 1 API call used (audit only)")
+        logger.info("PIPELINE COMPLETE (pre-generated) — 1 API call used (audit only)")
     else:
-        print(f"PIPELINE COMPLETE (API-generated) — Pass 1 + audit")
-    print(f"Awaiting your approval")
-    print(f"{'='*60}\n")
+        logger.info("PIPELINE COMPLETE (API-generated) — Pass 1 + audit")
+    logger.info("Awaiting your approval")
+    logger.info("=" * 60)
+    flush_log()
 
 
-def run_news_monitor_pipeline():
-    """Run the daily news monitoring scan."""
-    print(f"\n{'='*60}")
-    print(f"NEWS MONITOR — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    print(f"{'='*60}\n")
+def run_news_monitor_pipeline(use_batch: bool | None = None):
+    """Run the daily news monitoring scan (use_batch defaults to NEWS_USE_BATCH)."""
+    logger.info("=" * 60)
+    logger.info("NEWS MONITOR — %s", datetime.now().strftime("%Y-%m-%d %H:%M"))
+    logger.info("=" * 60)
 
-    report = run_news_monitor()
+    report = run_news_monitor(use_batch)
 
     if report.get("no_alerts", True) and not report.get("alerts"):
-        print("  No new regulatory developments detected today.")
+        logger.info("No new regulatory developments detected today.")
+        flush_log()
         return
 
     # Save alerts to disk so they can be triggered later from dashboard
     alerts_dir = DRAFTS_DIR.parent / "alerts"
     alerts_dir.mkdir(exist_ok=True)
 
+    emails = []
     for alert in report.get("alerts", []):
-        print(f"\n  🔴 ALERT: {alert.get('headline', 'Unknown')}")
-        print(f"     Source: {alert.get('source', 'Unknown')}")
-        print(f"     Urgency: {alert.get('urgency', 'Unknown')}")
+        logger.info("🔴 ALERT: %s", alert.get("headline", "Unknown"))
+        logger.info("Source: %s", alert.get("source", "Unknown"))
+        logger.info("Urgency: %s", alert.get("urgency", "Unknown"))
 
         # Generate a unique alert ID
-        import hashlib
         alert_id = hashlib.md5(alert.get("headline", "").encode()).hexdigest()[:12]
         alert["alert_id"] = alert_id
         alert["timestamp"] = datetime.now().isoformat()
@@ -1599,16 +2677,18 @@ def run_news_monitor_pipeline():
 
         # Save alert to disk
         alert_path = alerts_dir / f"{alert_id}.json"
-        alert_path.write_text(json.dumps(alert, indent=2, ensure_ascii=False), encoding="utf-8")
-        print(f"     Saved alert: {alert_id}")
+        write_json(alert_path, alert)
+        logger.info("Saved alert: %s", alert_id)
 
-        # Send email with "Approve & Generate" button
+        # Queue an email with "Approve & Generate" button
         try:
-            subject, plain, html = format_news_alert_with_button(alert)
-            send_email(subject, plain, html)
-            print(f"     ✓ Email alert sent")
+            emails.append(format_news_alert_with_button(alert))
         except Exception as e:
-            print(f"     ✗ Email error: {e}")
+            logger.error("✗ Email error: %s", e)
+
+    # All of today's alerts go out together over one connection
+    send_emails(emails)
+    flush_log()
 
 
 def format_news_alert_with_button(alert: dict) -> tuple[str, str, str]:
@@ -1618,48 +2698,13 @@ def format_news_alert_with_button(alert: dict) -> tuple[str, str, str]:
     alert_id = alert.get("alert_id", "unknown")
     generate_url = f"{dashboard_url}/generate-alert/{alert_id}"
 
-    subject = f"🔴 New Content Opportunity: {alert.get('headline', 'Regulatory Update')[:50]}"
-
-    plain_text = f"""BREAKING: Content Opportunity Detected
-
-Headline: {alert['headline']}
-Source: {alert['source']}
-Relevance: {alert['relevance']}
-Urgency: {alert['urgency']}
-
-Suggested post: "{alert['suggested_title']}"
-Cluster: {alert.get('cluster', 'N/A')}
-
-To generate this article, click: {generate_url}
-"""
-
-    html = f"""
-    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-      <div style="background: #0F172A; padding: 20px 24px; border-radius: 12px 12px 0 0;">
-        <span style="color: #CC0000; font-weight: 900; font-size: 18px;">PuertoRico</span><span style="color: #3A99D8; font-weight: 900; font-size: 18px;">LLC</span>
-        <span style="color: #EF4444; font-size: 14px; margin-left: 8px;">⚡ ALERT</span>
-      </div>
-      <div style="background: #ffffff; border: 1px solid #E2E8F0; padding: 24px; border-radius: 0 0 12px 12px;">
-        <div style="background: #FEF2F2; border-left: 4px solid #EF4444; padding: 12px 16px; border-radius: 0 8px 8px 0; margin-bottom: 20px;">
-          <strong style="font-size: 14px; color: #991B1B;">🔴 Urgency: {alert['urgency']}</strong>
-        </div>
-        <h2 style="color: #0F172A; font-size: 20px; margin: 0 0 12px 0;">{alert['headline']}</h2>
-        <p style="color: #475569; font-size: 14px;"><strong>Source:</strong> {alert['source']}</p>
-        <p style="color: #475569; font-size: 14px;"><strong>Why it matters:</strong> {alert['relevance']}</p>
-        <div style="background: #F8FAFC; padding: 16px; border-radius: 8px; margin: 16px 0;">
-          <p style="color: #64748B; font-size: 13px; margin: 0 0 4px 0;">Suggested blog post:</p>
-          <p style="color: #0F172A; font-weight: bold; margin: 0;">&ldquo;{alert['suggested_title']}&rdquo;</p>
-          <p style="color: #64748B; font-size: 12px; margin: 8px 0 0 0;">Category: {alert.get('cluster', 'Tax Strategy')}</p>
-        </div>
-        <div style="text-align: center; margin: 24px 0 16px 0;">
-          <a href="{generate_url}" style="display: inline-block; background: #16A34A; color: #ffffff; padding: 14px 32px; border-radius: 8px; text-decoration: none; font-weight: bold; font-size: 16px;">✅ Approve &amp; Generate Article</a>
-        </div>
-        <p style="color: #94A3B8; font-size: 11px; text-align: center;">Clicking will start article generation (~8 min). You'll review it before publishing.</p>
-      </div>
-    </div>
-    """
-
-    return subject, plain_text, html
+    return _news_alert_email(
+        alert,
+        action=f"To generate this article, click: {generate_url}",
+        details_html=_NEWS_ALERT_CATEGORY_HTML.format(
+            cluster=html_lib.escape(str(alert.get("cluster", "Tax Strategy")))),
+        footer_html=_NEWS_ALERT_BUTTON_FOOTER.format(generate_url=html_lib.escape(generate_url)),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -1667,33 +2712,31 @@ To generate this article, click: {generate_url}
 # ---------------------------------------------------------------------------
 
 def approve_and_deploy(slug: str):
-    """Deploy an approved blog post to GitHub."""
-    import subprocess
-
+    """Copy a draft to APPROVED_DIR, push it to GitHub and add it to the blog index."""
     draft_path = DRAFTS_DIR / f"{slug}.html"
     if not draft_path.exists():
-        print(f"Draft not found: {draft_path}")
+        logger.error("Draft not found: %s", draft_path)
         return False
 
     # Move to approved
     approved_path = APPROVED_DIR / f"{slug}.html"
-    html = draft_path.read_text(encoding="utf-8")
-    approved_path.write_text(html, encoding="utf-8")
-
-    # In production, this would:
-    # 1. git clone the repo (or pull latest)
-    # 2. Copy the HTML file to the repo root
-    # 3. Update blog.html with the new card
-    # 4. Update sitemap.xml with the new entry
-    # 5. git add, commit, push
-    # 6. Hostinger auto-deploys from GitHub
+    copy_file(draft_path, approved_path)
+
+    # Deploy in-process through the GitHub API — no clone, no git subprocesses.
+    # The article and its blog index card land in one commit, so Hostinger
+    # auto-deploys once.
+    html = approved_path.read_text(encoding="utf-8")
+    if not publish_post(slug, html):
+        flush_log()
+        return False
 
-    print(f"✓ Post approved and deployed: {slug}")
-    print(f"  Blog file: {SITE_URL}/{slug}.html")
+    logger.info("✓ Post approved and deployed: %s", slug)
+    logger.info("Blog file: %s/%s.html", SITE_URL, slug)
+    flush_log()
 
     # Send confirmation
     try:
-        send_email(
+        send_email_async(
             f"✅ Published: {slug}",
             f"Your blog post is live!\n\n{SITE_URL}/{slug}.html\n\nSocial content ready in dashboard: {DASHBOARD_URL}/social/{slug}",
             f'<p>Your blog post is live!</p><p><a href="{SITE_URL}/{slug}.html">{SITE_URL}/{slug}.html</a></p><p><a href="{DASHBOARD_URL}/social/{slug}">View social content →</a></p>',
@@ -1714,22 +2757,33 @@ def main():
                         required=True, help="Pipeline mode")
     parser.add_argument("--topic", type=str, help="Custom topic for 'generate' mode")
     parser.add_argument("--slug", type=str, help="Post slug for 'approve' mode")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached Claude responses and call the API fresh")
+    parser.add_argument("--batch", action="store_true",
+                        help="Run Pass 4 social derivatives through the Message Batches API")
 
     args = parser.parse_args()
 
+    if args.no_cache:
+        global USE_RESPONSE_CACHE
+        USE_RESPONSE_CACHE = False
+    if args.batch:
+        global SOCIAL_USE_BATCH
+        SOCIAL_USE_BATCH = True
+
     if args.mode == "scheduled":
         run_scheduled_pipeline()
     elif args.mode == "reactive":
         run_news_monitor_pipeline()
     elif args.mode == "approve":
         if not args.slug:
-            print("--slug required for approve mode")
+            logger.error("--slug required for approve mode")
             return
         approve_and_deploy(args.slug)
     elif args.mode == "generate":
         # Custom topic generation — creates a one-off post
         if not args.topic:
-            print("--topic required for generate mode")
+            logger.error("--topic required for generate mode")
             return
         custom_post = {
             "slug": f"blog-{args.topic.lower().replace(' ', '-')[:50]}",
@@ -1743,8 +2797,8 @@ def main():
         calendar = load_calendar()
         html = pass1_generate(custom_post, calendar)
         path = DRAFTS_DIR / f"{custom_post['slug']}.html"
-        path.write_text(html, encoding="utf-8")
-        print(f"Draft saved: {path}")
+        atomic_write(path, html)
+        logger.info("Draft saved: %s", path)
 
 
 if __name__ == "__main__":
@@ -11,7 +11,6 @@ One service = one volume = no file sharing issues.
 """
 
 import os
-import json
 import threading
 from pathlib import Path
 from datetime import datetime
@@ -22,13 +21,15 @@ from blog_engine import (
     run_news_monitor_pipeline,
     DRAFTS_DIR,
     APPROVED_DIR,
+    atomic_write,
+    copy_file,
+    flush_log,
+    read_json,
+    write_json,
 )
 
 app = Flask(__name__)
 
-DRAFTS_DIR.mkdir(exist_ok=True)
-APPROVED_DIR.mkdir(exist_ok=True)
-
 
 # ---------------------------------------------------------------------------
 # BACKGROUND SCHEDULER
@@ -389,11 +390,11 @@ def load_draft(slug):
         return None
     html = html_path.read_text(encoding="utf-8")
     try:
-        audit = json.loads(audit_path.read_text()) if audit_path.exists() else {}
+        audit = read_json(audit_path) if audit_path.exists() else {}
     except Exception:
         audit = {}
     try:
-        social = json.loads(social_path.read_text()) if social_path.exists() else {}
+        social = read_json(social_path) if social_path.exists() else {}
     except Exception:
         social = {}
     return {"html": html, "audit": audit, "social": social, "slug": slug}
@@ -433,40 +434,25 @@ def review(slug):
 def approve(slug):
     html = request.form.get("html", "")
     if html:
-        (DRAFTS_DIR / f"{slug}.html").write_text(html, encoding="utf-8")
+        atomic_write(DRAFTS_DIR / f"{slug}.html", html)
     src = DRAFTS_DIR / f"{slug}.html"
     dst = APPROVED_DIR / f"{slug}.html"
     if src.exists():
+        copy_file(src, dst)
         content = src.read_text(encoding="utf-8")
-        dst.write_text(content, encoding="utf-8")
 
-        # Push to GitHub → triggers Hostinger deployment → goes live
+        # Push the article and its blog.html index card to GitHub in one
+        # commit → triggers Hostinger deployment → goes live
         try:
-            from blog_engine import push_to_github, update_blog_index, load_calendar
-            filename = f"{slug}.html"
-            push_to_github(filename, content, f"Publish: {slug}")
-            print(f"  ✓ Approved and pushed to GitHub: {filename}")
-
-            # Update blog.html index page with new article card
-            try:
-                calendar = load_calendar()
-                # Find the post in the calendar by slug
-                post = None
-                for p in calendar.get("posts", []):
-                    if p["slug"] == slug:
-                        post = p
-                        break
-                if post:
-                    update_blog_index(post, calendar)
-                else:
-                    print(f"  ⚠ Post {slug} not found in calendar — blog index not updated")
-            except Exception as e:
-                print(f"  ⚠ Blog index update failed: {e}")
+            from blog_engine import publish_post
+            if publish_post(slug, content):
+                print(f"  ✓ Approved and pushed to GitHub: {slug}.html")
         except Exception as e:
             print(f"  ✗ GitHub push failed: {e}")
+        flush_log()
 
         src.unlink()
-        for extra in [f"{slug}_audit.json", f"{slug}_social.json", f"{slug}_card.html", f"{slug}_sitemap.xml"]:
+        for extra in [f"{slug}_audit.json", f"{slug}_social.json", f"{slug}_card.html", f"{slug}_sitemap.xml", f"{slug}_checks.json"]:
             p = DRAFTS_DIR / extra
             if p.exists():
                 p.unlink()
@@ -478,7 +464,7 @@ def reject(slug):
     src = DRAFTS_DIR / f"{slug}.html"
     if src.exists():
         src.unlink()
-        for extra in [f"{slug}_audit.json", f"{slug}_social.json", f"{slug}_card.html", f"{slug}_sitemap.xml"]:
+        for extra in [f"{slug}_audit.json", f"{slug}_social.json", f"{slug}_card.html", f"{slug}_sitemap.xml", f"{slug}_checks.json"]:
             p = DRAFTS_DIR / extra
             if p.exists():
                 p.unlink()
@@ -489,7 +475,7 @@ def reject(slug):
 def save(slug):
     html = request.form.get("html", "")
     if html:
-        (DRAFTS_DIR / f"{slug}.html").write_text(html, encoding="utf-8")
+        atomic_write(DRAFTS_DIR / f"{slug}.html", html)
     return redirect(f"/review/{slug}")
 
 
@@ -498,7 +484,7 @@ def reset(slug):
     """Clear a post from both drafts and approved so it can be regenerated."""
     cleared = []
     for folder in [DRAFTS_DIR, APPROVED_DIR]:
-        for pattern in [f"{slug}.html", f"{slug}_audit.json", f"{slug}_social.json", f"{slug}_card.html", f"{slug}_sitemap.xml"]:
+        for pattern in [f"{slug}.html", f"{slug}_audit.json", f"{slug}_social.json", f"{slug}_card.html", f"{slug}_sitemap.xml", f"{slug}_checks.json"]:
             p = folder / pattern
             if p.exists():
                 p.unlink()
@@ -567,7 +553,7 @@ def generate_alert(alert_id):
     if not alert_path.exists():
         return f"Alert {alert_id} not found. It may have already been generated or expired.", 404
 
-    alert = json.loads(alert_path.read_text(encoding="utf-8"))
+    alert = read_json(alert_path)
 
     if alert.get("status") == "generating":
         return "⏳ This article is already being generated. Check your dashboard in ~8 minutes."
@@ -577,7 +563,7 @@ def generate_alert(alert_id):
 
     # Mark as generating
     alert["status"] = "generating"
-    alert_path.write_text(json.dumps(alert, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_json(alert_path, alert)
 
     def run():
         try:
@@ -600,12 +586,12 @@ def generate_alert(alert_id):
 
             # Mark as drafted
             alert["status"] = "drafted"
-            alert_path.write_text(json.dumps(alert, indent=2, ensure_ascii=False), encoding="utf-8")
+            write_json(alert_path, alert)
         except Exception as e:
             print(f"Alert generation error: {e}")
             alert["status"] = "error"
             alert["error"] = str(e)
-            alert_path.write_text(json.dumps(alert, indent=2, ensure_ascii=False), encoding="utf-8")
+            write_json(alert_path, alert)
 
     threading.Thread(target=run, daemon=True).start()
 
@@ -627,12 +613,11 @@ def generate_alert(alert_id):
 @app.route("/alerts")
 def view_alerts():
     """View all saved news alerts and their status."""
-    alerts_dir = DRAFTS_DIR.parent / "alerts"
-    alerts_dir.mkdir(exist_ok=True)
+    alerts_dir = DRAFTS_DIR.parent / "alerts"  # glob of a missing dir yields nothing
     alerts = []
     for f in sorted(alerts_dir.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True):
         try:
-            alerts.append(json.loads(f.read_text(encoding="utf-8")))
+            alerts.append(read_json(f))
         except:
             pass
     return render_template_string(ALERTS_TEMPLATE, alerts=alerts)
@@ -642,7 +627,8 @@ def view_alerts():
 def trigger_news():
     def run():
         try:
-            run_news_monitor_pipeline()
+            # A manual trigger is watched, so skip the batch queue and scan in real time
+            run_news_monitor_pipeline(use_batch=False)
         except Exception as e:
             print(f"News monitor error: {e}")
     threading.Thread(target=run, daemon=True).start()
@@ -652,16 +638,20 @@ def trigger_news():
 @app.route("/repush")
 def repush_approved():
     """Re-push all approved files to GitHub (for files that were approved before GitHub push was added)."""
-    from blog_engine import push_to_github
+    from blog_engine import push_files_to_github
+    files = {}
     results = []
     for f in APPROVED_DIR.glob("*.html"):
         try:
-            content = f.read_text(encoding="utf-8")
-            ok = push_to_github(f.name, content, f"Publish: {f.stem}")
-            results.append(f"{f.name}: {'✓' if ok else '✗'}")
+            files[f.name] = f.read_text(encoding="utf-8")
         except Exception as e:
             results.append(f"{f.name}: error - {e}")
-    return "<br>".join(results) if results else "No approved files found"
+    if not files:
+        return "<br>".join(results) if results else "No approved files found"
+    # One commit for the whole set instead of a read + write API call per file
+    ok = push_files_to_github(files, f"Re-publish {len(files)} approved posts")
+    results.extend(f"{name}: {'✓' if ok else '✗'}" for name in files)
+    return "<br>".join(results)
 
 
 ALERTS_TEMPLATE = """